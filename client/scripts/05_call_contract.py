@@ -1,11 +1,9 @@
 import os
-import json
-import hashlib
-import binascii
 from dotenv import load_dotenv
 from stellar_sdk import Keypair, Network, Address, TransactionBuilder
 from stellar_sdk import SorobanServer
 from stellar_sdk import scval
+from common import generate_terms_digest
 
 load_dotenv()
 rpc = SorobanServer(os.environ["SOROBAN_RPC"])
@@ -14,13 +12,6 @@ tenant = Keypair.from_secret(os.environ["TENANT_SECRET"])
 landlord_pub = Keypair.from_secret(os.environ["LANDLORD_SECRET"]).public_key
 contract_id = "CDBFB6YDB55G7E5ZGOHYIYBLS745NVBU73TKLB6N6IT6XBKBWICNUW5I"  # Updated contract ID
 
-# Generate terms hash (canonical JSON format)
-def generate_terms_hash(terms_dict):
-    """Generate SHA-256 hash of canonical JSON terms"""
-    canon = json.dumps(terms_dict, separators=(',', ':'), sort_keys=True).encode()
-    h = hashlib.sha256(canon).digest()
-    return binascii.hexlify(h).decode()
-
 # Example terms
 terms_dict = {
     "rent": "500.00",
@@ -28,11 +19,9 @@ terms_dict = {
     "notice_days": 30,
     "penalty": "0.02"
 }
-terms_hash_hex = generate_terms_hash(terms_dict)
-print(f"Terms hash: {terms_hash_hex}")
-
-# Convert hex to BytesN<32>
-terms_bytes = bytes.fromhex(terms_hash_hex)
+# Raw 32-byte digest for BytesN<32>
+terms_bytes = generate_terms_digest(terms_dict)
+print(f"Terms hash: {terms_bytes.hex()}")
 
 # Get account sequence number
 account = rpc.load_account(tenant.public_key)
@@ -22,7 +22,7 @@ from stellar_sdk.xdr import SCVal, SCValType
 
 # Add the client scripts directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
-from common import actor_from_env, ensure_funded, balances
+from common import actor_from_env, ensure_funded, balances, generate_terms_digest
 
 load_dotenv()
 
@@ -204,7 +204,7 @@ def create_sublease_for_winner(winner_address):
         "duration": 12,
         "utilities": "included"
     }
-    terms_hash = generate_terms_hash(terms_dict)
+    terms_bytes = generate_terms_digest(terms_dict)
     
     source_account = soroban_server.load_account(tenant.kp.public_key)
     
@@ -216,7 +216,7 @@ def create_sublease_for_winner(winner_address):
                 args=[
                     SCVal.from_u64(1),  # parent_id
                     SCVal.from_address(winner_address),  # sublessee
-                    SCVal.from_bytes(bytes.fromhex(terms_hash)),  # terms
+                    SCVal.from_bytes(terms_bytes),  # terms
                     SCVal.from_u32(2),  # limit
                     SCVal.from_u64(int(time.time()) + 31536000),  # expiry_ts (1 year)
                 ],
@@ -237,15 +237,6 @@ def create_sublease_for_winner(winner_address):
         print(f"Failed to create sublease: {result}")
         return False
 
-def generate_terms_hash(terms_dict):
-    """Generate SHA-256 hash of canonical JSON terms"""
-    import json
-    import hashlib
-    
-    canon = json.dumps(terms_dict, separators=(',', ':'), sort_keys=True).encode('utf-8')
-    h = hashlib.sha256(canon).digest()
-    return h.hex()
-
 def main():
     """Main demo function"""
     print("=== Auction Demo ===")
@@ -1,7 +1,10 @@
-import os, requests, time, json, hashlib
+import os, requests, time, json, hashlib, functools
 from dataclasses import dataclass
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from stellar_sdk import Server, Keypair
+from stellar_sdk.exceptions import NotFoundError
 
 load_dotenv()
 
@@ -10,6 +13,15 @@ PASSPHRASE = os.environ["NETWORK_PASSPHRASE"]
 
 server = Server(HORIZON)
 
+# Shared keep-alive session for friendbot and batched JSON-RPC, so repeated
+# calls reuse one TCP/TLS connection per host. Retries only cover idempotent
+# methods; POSTs are never resent.
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.3)))
+
+# Accounts known to exist on the network
+_funded = set()
+
 @dataclass
 class Actor:
     kp: Keypair
@@ -18,13 +30,77 @@ def actor_from_env(name: str) -> Actor:
     sec = os.environ[name]
     return Actor(kp=Keypair.from_secret(sec))
 
+@functools.lru_cache(maxsize=None)
+def keypair_from_secret(secret: str) -> Keypair:
+    """Parse a secret seed once; repeat calls reuse the derived keypair"""
+    return Keypair.from_secret(secret)
+
+def random_keypairs(n: int):
+    """
+    Generate n random keypairs from a single entropy read.
+    
+    Derivation runs in-process: each key costs tens of microseconds, far
+    less than starting a process pool for the few dozen keys scripts need.
+    """
+    buf = os.urandom(32 * n)
+    return [Keypair.from_raw_ed25519_seed(buf[i:i + 32]) for i in range(0, 32 * n, 32)]
+
 def ensure_funded(pubkey: str):
-    # idempotent for testnet friendbot
-    r = requests.get("https://friendbot.stellar.org", params={"addr": pubkey}, timeout=15)
-    if r.status_code not in (200, 202, 400):  # 400 means already funded
+    # idempotent for testnet friendbot; accounts that already exist are
+    # remembered so repeat calls skip both friendbot and the ledger wait
+    if pubkey in _funded:
+        return
+    try:
+        server.accounts().account_id(pubkey).call()
+    except NotFoundError:
+        r = session.get("https://friendbot.stellar.org", params={"addr": pubkey}, timeout=15)
+        if r.status_code not in (200, 202, 400):  # 400 means already funded
+            r.raise_for_status()
+        # wait ledger close
+        time.sleep(2)
+    _funded.add(pubkey)
+
+def batch_rpc(rpc_url: str, calls, max_batch_size: int = 10):
+    """
+    Send JSON-RPC calls as batch POSTs instead of one request per call.
+    
+    Args:
+        rpc_url: JSON-RPC endpoint (e.g. Soroban RPC)
+        calls: List of (method, params) tuples
+        max_batch_size: Maximum calls packed into a single POST
+        
+    Returns:
+        list: Response objects in the same order as calls. A call the server
+        didn't answer gets a JSON-RPC error object in its place.
+    """
+    results = [None] * len(calls)
+    for start in range(0, len(calls), max_batch_size):
+        payload = [
+            {"jsonrpc": "2.0", "id": start + i, "method": method, "params": params}
+            for i, (method, params) in enumerate(calls[start:start + max_batch_size])
+        ]
+        r = session.post(rpc_url, json=payload, timeout=15)
         r.raise_for_status()
-    # wait ledger close
-    time.sleep(2)
+        body = r.json()
+        if not isinstance(body, list):
+            # The server doesn't accept batches (it answers with a single
+            # error object), so send this chunk's calls one at a time
+            body = []
+            for request in payload:
+                r = session.post(rpc_url, json=request, timeout=15)
+                r.raise_for_status()
+                body.append(r.json())
+        for response in body:
+            if isinstance(response, dict) and response.get("id") in range(start, start + len(payload)):
+                results[response["id"]] = response
+    for call_id, response in enumerate(results):
+        if response is None:
+            results[call_id] = {
+                "jsonrpc": "2.0",
+                "id": call_id,
+                "error": {"code": -32603, "message": "No response to this call in the batch"}
+            }
+    return results
 
 def balances(pubkey: str):
     acct = server.accounts().account_id(pubkey).call()
@@ -34,6 +110,38 @@ def balances(pubkey: str):
         out[code] = b["balance"]
     return out
 
+def canonical_terms(terms_dict):
+    """
+    Encode terms as canonical JSON: sorted keys, no whitespace, UTF-8.
+    
+    Args:
+        terms_dict: Dictionary containing lease terms
+        
+    Returns:
+        bytes: Canonical JSON encoding
+    """
+    # These bytes are hashed and stored on-chain, so the encoder is pinned to
+    # stdlib json. Faster encoders such as orjson emit different bytes for
+    # non-ASCII text (raw UTF-8 vs \u escapes) and exponents (1e16 vs
+    # 1e+16), which would silently change existing terms hashes.
+    return json.dumps(terms_dict, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+@functools.lru_cache(maxsize=1024)
+def canonical_terms_digest(canon):
+    """
+    SHA-256 digest of an already-canonicalized terms encoding.
+    
+    Scripts hash the same few term sets over and over, so results are
+    memoized per encoding.
+    
+    Args:
+        canon: Bytes returned by canonical_terms()
+        
+    Returns:
+        bytes: 32-byte SHA-256 digest
+    """
+    return hashlib.sha256(canon).digest()
+
 def generate_terms_hash(terms_dict):
     """
     Generate SHA-256 hash of canonical JSON terms.
@@ -44,23 +152,19 @@ def generate_terms_hash(terms_dict):
     Returns:
         str: Hex-encoded SHA-256 hash (64 characters)
     """
-    # Create canonical JSON: sorted keys, no whitespace, UTF-8 encoding
-    canon = json.dumps(terms_dict, separators=(',', ':'), sort_keys=True).encode('utf-8')
-    
-    # Generate SHA-256 hash
-    h = hashlib.sha256(canon).digest()
-    
-    # Return as hex string
-    return h.hex()
+    return canonical_terms_digest(canonical_terms(terms_dict)).hex()
 
-def hex_to_bytes(hex_string):
+def generate_terms_digest(terms_dict):
     """
-    Convert hex string to bytes for Stellar SDK.
+    Generate the raw SHA-256 digest of canonical JSON terms.
+    
+    Use this when the hash is passed on-chain; generate_terms_hash() is the
+    hex form for display.
     
     Args:
-        hex_string: Hex string (64 characters for 32-byte hash)
+        terms_dict: Dictionary containing lease terms
         
     Returns:
-        bytes: Byte representation
+        bytes: 32-byte SHA-256 digest
     """
-    return bytes.fromhex(hex_string)
+    return canonical_terms_digest(canonical_terms(terms_dict))
@@ -9,24 +9,70 @@ including helper functions for creating lease chains and visualizing tree struct
 import os
 import json
 import sys
-from typing import List, Dict, Any, Optional
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Union
 from dotenv import load_dotenv
 from stellar_sdk import Keypair, Network, Address, TransactionBuilder
 from stellar_sdk import SorobanServer
 from stellar_sdk import scval
+from stellar_sdk.soroban_rpc import SendTransactionStatus
 
 # Add the scripts directory to the path to import common
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from common import generate_terms_hash, hex_to_bytes
+from common import batch_rpc, canonical_terms, canonical_terms_digest
 
 # Load environment variables from config.env in the parent directory
 config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.env')
-load_dotenv(config_path, override=True)
+# Variables already set in the environment take precedence over the file
+load_dotenv(config_path, override=False)
+
+# Default upper bound on entries in each per-instance LeaseAPI cache
+_CACHE_SIZE = 256
+
+# Max concurrent read RPCs issued for one tree level. Kept below the SDK
+# client's default connection pool size (10) so every worker reuses a
+# keep-alive connection instead of opening and discarding extra ones
+_READ_BATCH_SIZE = 8
+
+# Sentinel the contract uses for "no parent" in tree() rows
+_NO_PARENT = 2**64 - 1
+
+# Indent prefixes for tree printing, precomputed for typical depths
+_INDENTS = ["  " * i for i in range(32)]
+
+
+def _parse_children(vec_val) -> List[int]:
+    """Convert a children_of() vec result into a list of lease IDs"""
+    if not vec_val:
+        return []
+    return [int(child.obj.u64) for child in vec_val.scvec]
+
+
+def _parse_tree_row(row) -> tuple:
+    """Convert one tree() row into an (id, parent, lessee, depth, active) tuple"""
+    id_sc, parent_sc, lessee_sc, depth_sc, active_sc = row.obj.vec.scvec
+    parent_val = int(parent_sc.obj.u64)
+    return (
+        int(id_sc.obj.u64),
+        None if parent_val == _NO_PARENT else parent_val,
+        str(lessee_sc.obj.address),
+        int(depth_sc.obj.u32),
+        bool(active_sc.obj.b),
+    )
+
 
 class LeaseAPI:
     """Python wrapper for the lease registry contract"""
     
-    def __init__(self, contract_id: str, rpc_url: str = None, network_passphrase: str = None):
+    def __init__(
+        self, 
+        contract_id: str, 
+        rpc_url: str = None, 
+        network_passphrase: str = None, 
+        cache_size: int = _CACHE_SIZE
+    ):
         """
         Initialize the Lease API client
         
@@ -34,13 +80,34 @@ class LeaseAPI:
             contract_id: The deployed contract ID
             rpc_url: Soroban RPC URL (defaults to environment variable)
             network_passphrase: Network passphrase (defaults to testnet)
+            cache_size: Max entries kept in each of the terms/address caches
         """
         self.contract_id = contract_id
-        self.rpc = SorobanServer(rpc_url or os.environ["SOROBAN_RPC"])
+        self.rpc_url = rpc_url or os.environ["SOROBAN_RPC"]
+        self.rpc = SorobanServer(self.rpc_url)
         self.network_passphrase = network_passphrase or Network.TESTNET_NETWORK_PASSPHRASE
+        self._cache_size = cache_size
+        
+        # Cache of encoded terms-hash SCVals to avoid regenerating, keyed by
+        # the terms digest
+        self._terms_scval_cache: "OrderedDict[bytes, Any]" = OrderedDict()
+        
+        # Address SCVals by public key; chains reuse the same few accounts
+        self._addr_cache: "OrderedDict[str, Any]" = OrderedDict()
+        
+        # Source accounts by public key. TransactionBuilder.build() bumps the
+        # cached account's sequence number, so it stays in step with what
+        # has been submitted without a getAccount round-trip per transaction
+        self._account_cache: Dict[str, Any] = {}
+        
+        # children_of results for the ledger reads are pinned to; empty and
+        # unused until pin_reads_to_ledger() is called
+        self._reads_ledger: Optional[int] = None
+        self._children_cache: Dict[int, List[int]] = {}
         
-        # Cache for terms hash to avoid regenerating
-        self._terms_cache: Dict[str, bytes] = {}
+        # One bounded pool for concurrent reads, shared by every tree level;
+        # worker threads are only started once reads are submitted
+        self._read_pool = ThreadPoolExecutor(max_workers=_READ_BATCH_SIZE)
     
     def ensure_account_funded(self, public_key: str):
         """Ensure an account is funded for testing"""
@@ -52,20 +119,59 @@ class LeaseAPI:
             from common import ensure_funded
             ensure_funded(public_key)
     
-    def _get_terms_bytes(self, terms_dict: Dict[str, Any]) -> bytes:
-        """Get terms bytes from dict, using cache if available"""
-        terms_json = json.dumps(terms_dict, separators=(',', ':'), sort_keys=True)
-        if terms_json not in self._terms_cache:
-            terms_hash_hex = generate_terms_hash(terms_dict)
-            self._terms_cache[terms_json] = hex_to_bytes(terms_hash_hex)
-        return self._terms_cache[terms_json]
+    def _cache_put(self, cache: OrderedDict, key, value):
+        """Insert into an LRU cache, evicting the oldest entry past cache_size"""
+        cache[key] = value
+        if len(cache) > self._cache_size:
+            cache.popitem(last=False)
+    
+    def _get_terms_scval(self, terms_dict: Union[Dict[str, Any], bytes]):
+        """Get the terms-hash bytes SCVal from dict, using cache if available"""
+        # Callers that hashed the terms up front pass the 32-byte digest
+        if isinstance(terms_dict, bytes):
+            return scval.to_bytes(terms_dict)
+        
+        # The 32-byte SHA-256 digest is the key: collision-safe, unlike
+        # hash(), and far smaller than the canonical JSON of a long term set
+        digest = canonical_terms_digest(canonical_terms(terms_dict))
+        terms_sc = self._terms_scval_cache.get(digest)
+        if terms_sc is None:
+            terms_sc = scval.to_bytes(digest)
+            self._cache_put(self._terms_scval_cache, digest, terms_sc)
+        else:
+            self._terms_scval_cache.move_to_end(digest)
+        return terms_sc
+    
+    def _address_sc(self, public_key: str):
+        """Get the address SCVal for a public key, using cache if available"""
+        addr_sc = self._addr_cache.get(public_key)
+        if addr_sc is None:
+            addr_sc = scval.to_address(Address(public_key))
+            self._cache_put(self._addr_cache, public_key, addr_sc)
+        else:
+            self._addr_cache.move_to_end(public_key)
+        return addr_sc
     
     def _load_account(self, keypair: Keypair):
-        """Load account for transaction building"""
-        return self.rpc.load_account(keypair.public_key)
+        """Load account for transaction building, using cache if available"""
+        account = self._account_cache.get(keypair.public_key)
+        if account is None:
+            account = self.rpc.load_account(keypair.public_key)
+            self._account_cache[keypair.public_key] = account
+        return account
     
-    def _build_and_send_tx(self, keypair: Keypair, function_name: str, parameters: List):
-        """Build and send a transaction"""
+    def _invalidate_account(self, public_key: str):
+        """Drop a cached account so the next build reloads its sequence number"""
+        self._account_cache.pop(public_key, None)
+    
+    def _check_send(self, keypair: Keypair, send_result):
+        """Invalidate the signer's cached account if the send was rejected"""
+        if send_result.status not in (SendTransactionStatus.PENDING, SendTransactionStatus.DUPLICATE):
+            self._invalidate_account(keypair.public_key)
+        return send_result
+    
+    def _build_tx(self, keypair: Keypair, function_name: str, parameters: List):
+        """Build and sign a contract invocation transaction"""
         account = self._load_account(keypair)
         tx = TransactionBuilder(account, network_passphrase=self.network_passphrase, base_fee=100) \
             .append_invoke_contract_function_op(
@@ -74,28 +180,65 @@ class LeaseAPI:
                 parameters=parameters
             ).build()
         tx.sign(keypair)
-        return self.rpc.send_transaction(tx)
+        return tx
+    
+    def _build_and_send_tx(self, keypair: Keypair, function_name: str, parameters: List):
+        """
+        Build and send a transaction
+        
+        Sends without a simulate round-trip; calls that need the contract's
+        return value go through _simulate_and_send_tx instead.
+        """
+        tx = self._build_tx(keypair, function_name, parameters)
+        return self._check_send(keypair, self.rpc.send_transaction(tx))
+    
+    def _build_txs(self, function_name: str, calls: List[tuple]) -> List:
+        """
+        Build and sign one transaction per (keypair, parameters) pair
+        
+        Accounts come from the cache and their sequence numbers are bumped
+        locally, so several calls from the same signer stay ordered.
+        """
+        return [
+            self._build_tx(keypair, function_name, parameters)
+            for keypair, parameters in calls
+        ]
+    
+    def send_transaction_batch(self, txs: List) -> List[Dict]:
+        """
+        Submit several signed transactions in one JSON-RPC batch request
+        
+        Transactions from the same source account must already carry
+        consecutive sequence numbers.
+        
+        Returns:
+            Raw sendTransaction responses, in the same order as txs
+        """
+        responses = batch_rpc(self.rpc_url, [
+            ("sendTransaction", {"transaction": tx.to_xdr()}) for tx in txs
+        ])
+        for tx, response in zip(txs, responses):
+            status = response.get("result", {}).get("status")
+            if status not in ("PENDING", "DUPLICATE"):
+                self._invalidate_account(tx.transaction.source.account_id)
+        return responses
     
     def _simulate_and_send_tx(self, keypair: Keypair, function_name: str, parameters: List):
         """Simulate transaction to get return value, then send it"""
-        account = self._load_account(keypair)
-        tx = TransactionBuilder(account, network_passphrase=self.network_passphrase, base_fee=100) \
-            .append_invoke_contract_function_op(
-                contract_id=self.contract_id,
-                function_name=function_name,
-                parameters=parameters
-            ).build()
-        tx.sign(keypair)
+        tx = self._build_tx(keypair, function_name, parameters)
         
-        # First simulate to get the return value
+        # First simulate to get the return value. This can't be served from a
+        # per-signature cache: the value (e.g. a new lease ID) differs per call.
         simulate_result = self.rpc.simulate_transaction(tx)
         if not simulate_result.results:
+            # The built transaction is never sent, so its sequence number is unused
+            self._invalidate_account(keypair.public_key)
             print(f"ERROR: Simulation failed - {simulate_result.error}")
             raise Exception(f"Simulation failed: {simulate_result.error}")
         return_value = simulate_result.results[0].xdr
         
         # Then send the transaction
-        send_result = self.rpc.send_transaction(tx)
+        send_result = self._check_send(keypair, self.rpc.send_transaction(tx))
         
         return return_value, send_result
     
@@ -105,7 +248,7 @@ class LeaseAPI:
         unit: str, 
         landlord: Keypair, 
         master: Keypair, 
-        terms_dict: Dict[str, Any], 
+        terms_dict: Union[Dict[str, Any], bytes], 
         limit: int, 
         expiry_ts: int
     ) -> int:
@@ -117,20 +260,18 @@ class LeaseAPI:
             unit: Unit identifier (e.g., "unit:NYC:123-A")
             landlord: Landlord keypair
             master: Master tenant keypair
-            terms_dict: Terms dictionary
+            terms_dict: Terms dictionary or its precomputed digest
             limit: Maximum number of direct subleases
             expiry_ts: Expiry timestamp
             
         Returns:
             Lease ID
         """
-        terms_bytes = self._get_terms_bytes(terms_dict)
-        
         return_value, send_result = self._simulate_and_send_tx(keypair, "create_master", [
             scval.to_symbol(unit),
-            scval.to_address(Address(landlord.public_key)),
-            scval.to_address(Address(master.public_key)),
-            scval.to_bytes(terms_bytes),
+            self._address_sc(landlord.public_key),
+            self._address_sc(master.public_key),
+            self._get_terms_scval(terms_dict),
             scval.to_uint32(limit),
             scval.to_uint64(expiry_ts)
         ])
@@ -147,12 +288,26 @@ class LeaseAPI:
             scval.to_uint64(lease_id)
         ])
     
+    def accept_many(self, acceptances: List[tuple]) -> List[Dict]:
+        """
+        Accept several leases with a single batch submission
+        
+        Args:
+            acceptances: (keypair, lease_id) pairs
+            
+        Returns:
+            Raw sendTransaction responses, in the same order as acceptances
+        """
+        return self.send_transaction_batch(self._build_txs("accept", [
+            (keypair, [scval.to_uint64(lease_id)]) for keypair, lease_id in acceptances
+        ]))
+    
     def create_sublease(
         self, 
         keypair: Keypair, 
         parent_id: int, 
         sublessee: Keypair, 
-        terms_dict: Dict[str, Any], 
+        terms_dict: Union[Dict[str, Any], bytes], 
         limit: int, 
         expiry_ts: int
     ) -> int:
@@ -163,21 +318,30 @@ class LeaseAPI:
             keypair: Keypair to sign the transaction (should be parent lessee)
             parent_id: Parent lease ID
             sublessee: Sublessee keypair
-            terms_dict: Terms dictionary (must match parent)
+            terms_dict: Terms dictionary or its digest (must match parent)
             limit: Maximum number of direct subleases (must be <= parent limit)
             expiry_ts: Expiry timestamp (must be <= parent expiry)
             
         Returns:
             New lease ID
         """
-        terms_bytes = self._get_terms_bytes(terms_dict)
-        
-        return_value, send_result = self._simulate_and_send_tx(keypair, "create_sublease", [
-            scval.to_uint64(parent_id),
-            scval.to_address(Address(sublessee.public_key)),
-            scval.to_bytes(terms_bytes),
+        return self._create_sublease_sc(
+            keypair,
+            parent_id,
+            sublessee,
+            self._get_terms_scval(terms_dict),
             scval.to_uint32(limit),
             scval.to_uint64(expiry_ts)
+        )
+    
+    def _create_sublease_sc(self, keypair: Keypair, parent_id: int, sublessee: Keypair, terms_sc, limit_sc, expiry_sc) -> int:
+        """Create a sublease from already-encoded terms/limit/expiry SCVals"""
+        return_value, send_result = self._simulate_and_send_tx(keypair, "create_sublease", [
+            scval.to_uint64(parent_id),
+            self._address_sc(sublessee.public_key),
+            terms_sc,
+            limit_sc,
+            expiry_sc
         ])
         
         # Extract lease ID from return value
@@ -203,19 +367,70 @@ class LeaseAPI:
             "active": True
         }
     
+    def pin_reads_to_ledger(self, ledger_seq: Optional[int] = None) -> int:
+        """
+        Memoize children_of results for one ledger
+        
+        Repeated tree walks (e.g. during a billing run) are then served from
+        memory. Pinning to a different ledger drops the memoized results.
+        
+        Args:
+            ledger_seq: Ledger to pin to (defaults to the latest ledger)
+            
+        Returns:
+            The pinned ledger sequence
+        """
+        if ledger_seq is None:
+            ledger_seq = self.rpc.get_latest_ledger().sequence
+        if ledger_seq != self._reads_ledger:
+            self._children_cache.clear()
+            self._reads_ledger = ledger_seq
+        return ledger_seq
+    
     def children_of(self, lease_id: int) -> List[int]:
         """Get children of a lease"""
+        if self._reads_ledger is not None:
+            children = self._children_cache.get(lease_id)
+            if children is None:
+                children = self._children_cache[lease_id] = self._fetch_children(lease_id)
+            return children
+        return self._fetch_children(lease_id)
+    
+    def _fetch_children(self, lease_id: int) -> List[int]:
+        """Read the children of a lease from the contract"""
         result = self.rpc.invoke_contract_function(
             contract_id=self.contract_id,
             function_name="children_of",
             parameters=[scval.to_uint64(lease_id)]
         )
         
-        children = []
-        if result.results[0].xdr.scval.obj.vec:
-            for child in result.results[0].xdr.scval.obj.vec.scvec:
-                children.append(int(child.obj.u64))
-        return children
+        return _parse_children(result.results[0].xdr.scval.obj.vec)
+    
+    def _children_of_many(self, lease_ids: List[int]) -> Dict[int, List[int]]:
+        """Get children of several leases, issuing the reads concurrently"""
+        if len(lease_ids) <= 1:
+            return {lease_id: self.children_of(lease_id) for lease_id in lease_ids}
+        
+        return dict(zip(lease_ids, self._read_pool.map(self.children_of, lease_ids)))
+    
+    def _lease_and_children(self, lease_id: int) -> tuple:
+        """Get a lease together with its child IDs"""
+        return self.get_lease(lease_id), self.children_of(lease_id)
+    
+    def get_leases_batch(self, lease_ids: List[int]) -> List[tuple]:
+        """
+        Get several leases and their children, issuing the reads concurrently
+        
+        Args:
+            lease_ids: Lease IDs to fetch
+            
+        Returns:
+            (lease, child_ids) pairs, in the same order as lease_ids
+        """
+        if len(lease_ids) <= 1:
+            return [self._lease_and_children(lease_id) for lease_id in lease_ids]
+        
+        return list(self._read_pool.map(self._lease_and_children, lease_ids))
     
     def parent_of(self, lease_id: int) -> Optional[int]:
         """Get parent of a lease"""
@@ -244,6 +459,20 @@ class LeaseAPI:
             scval.to_uint64(lease_id)
         ])
     
+    def set_active_many(self, activations: List[tuple]) -> List[Dict]:
+        """
+        Activate several leases with a single batch submission
+        
+        Args:
+            activations: (keypair, lease_id) pairs
+            
+        Returns:
+            Raw sendTransaction responses, in the same order as activations
+        """
+        return self.send_transaction_batch(self._build_txs("set_active", [
+            (keypair, [scval.to_uint64(lease_id)]) for keypair, lease_id in activations
+        ]))
+    
     def set_delinquent(self, keypair: Keypair, lease_id: int) -> Dict:
         """Mark lease as delinquent"""
         return self._build_and_send_tx(keypair, "set_delinquent", [
@@ -260,7 +489,7 @@ class LeaseAPI:
         """Replace sublessee of an unaccepted lease"""
         return self._build_and_send_tx(keypair, "replace_sublessee", [
             scval.to_uint64(lease_id),
-            scval.to_address(Address(new_lessee.public_key))
+            self._address_sc(new_lessee.public_key)
         ])
     
     def terms_of(self, lease_id: int) -> str:
@@ -278,7 +507,7 @@ class LeaseAPI:
         parent_keypair: Keypair, 
         parent_id: int, 
         sublessees: List[Keypair], 
-        terms_dict: Dict[str, Any], 
+        terms_dict: Union[Dict[str, Any], bytes], 
         limit: int, 
         expiry_ts: int
     ) -> List[int]:
@@ -289,7 +518,7 @@ class LeaseAPI:
             parent_keypair: Keypair of the parent lessee
             parent_id: Parent lease ID
             sublessees: List of sublessee keypairs
-            terms_dict: Terms dictionary
+            terms_dict: Terms dictionary or its precomputed digest
             limit: Limit for each sublease
             expiry_ts: Expiry timestamp
             
@@ -300,27 +529,78 @@ class LeaseAPI:
         current_parent_id = parent_id
         current_keypair = parent_keypair
         
-        for sublessee in sublessees:
-            # Create sublease
-            child_id = self.create_sublease(
-                current_keypair, 
-                current_parent_id, 
-                sublessee, 
-                terms_dict, 
-                limit, 
-                expiry_ts
-            )
-            lease_ids.append(child_id)
-            
-            # Accept the sublease
-            self.accept(sublessee, child_id)
-            
-            # Move to next level
-            current_parent_id = child_id
-            current_keypair = sublessee
+        # Terms, limit and expiry are the same at every level; encode once.
+        # Per level only the parent ID is encoded (addresses are cached).
+        # Pre-packed XDR bytes wouldn't help: the builder takes SCVal objects
+        # and serializes the whole envelope itself.
+        terms_sc = self._get_terms_scval(terms_dict)
+        limit_sc = scval.to_uint32(limit)
+        expiry_sc = scval.to_uint64(expiry_ts)
+        
+        # Levels are strictly serial: each create_sublease needs the previous
+        # child_id from simulation. The contract doesn't require a parent to
+        # be accepted before it is subleased, so the accepts (one per distinct
+        # sublessee) are collected and submitted as a single batch at the end.
+        acceptances = []
+        try:
+            for sublessee in sublessees:
+                # Create sublease
+                child_id = self._create_sublease_sc(
+                    current_keypair, 
+                    current_parent_id, 
+                    sublessee, 
+                    terms_sc, 
+                    limit_sc, 
+                    expiry_sc
+                )
+                lease_ids.append(child_id)
+                
+                acceptances.append((sublessee, child_id))
+                
+                # Move to next level
+                current_parent_id = child_id
+                current_keypair = sublessee
+        except Exception:
+            # Still accept the levels created before the failure
+            if acceptances:
+                self.accept_many(acceptances)
+            raise
+        
+        # Accept all subleases
+        if acceptances:
+            responses = self.accept_many(acceptances)
+            failed = [
+                lease_id for (_, lease_id), response in zip(acceptances, responses)
+                if response.get("result", {}).get("status") not in ("PENDING", "DUPLICATE")
+            ]
+            if failed:
+                print(f"ERROR: Accept failed for leases {failed}")
+                raise Exception(f"Accept failed for leases {failed}")
         
         return lease_ids
     
+    def get_subtree(self, root_id: int) -> Dict[int, List[int]]:
+        """
+        Get the children of every lease in the tree under root_id
+        
+        Reads are issued one tree level at a time, so a tree costs one
+        round of concurrent children_of calls per level instead of one
+        sequential call per node.
+        
+        Args:
+            root_id: Root lease ID
+            
+        Returns:
+            Mapping of lease ID to its child IDs, for root_id and every descendant
+        """
+        subtree = {}
+        level = [root_id]
+        while level:
+            children_map = self._children_of_many(level)
+            subtree.update(children_map)
+            level = [child_id for node_id in level for child_id in children_map[node_id]]
+        return subtree
+    
     def get_lease_tree(self, root_id: int) -> Dict[str, Any]:
         """
         Get the entire lease tree structure
@@ -331,21 +611,28 @@ class LeaseAPI:
         Returns:
             Dictionary containing tree structure
         """
-        def build_tree(node_id: int) -> Dict[str, Any]:
-            lease = self.get_lease(node_id)
-            children = self.children_of(node_id)
-            
-            tree_node = {
-                "lease": lease,
-                "children": []
-            }
-            
-            for child_id in children:
-                tree_node["children"].append(build_tree(child_id))
-            
-            return tree_node
+        root = {
+            "lease": self.get_lease(root_id),
+            "children": []
+        }
         
-        return build_tree(root_id)
+        # Level-order walk: all children_of reads for one level are issued
+        # together, and no recursion limit applies to deep sublease chains
+        level = [(root_id, root)]
+        while level:
+            children_map = self._children_of_many([node_id for node_id, _ in level])
+            next_level = []
+            for node_id, tree_node in level:
+                for child_id in children_map[node_id]:
+                    child_node = {
+                        "lease": self.get_lease(child_id),
+                        "children": []
+                    }
+                    tree_node["children"].append(child_node)
+                    next_level.append((child_id, child_node))
+            level = next_level
+        
+        return root
     
     def tree(
         self, 
@@ -383,22 +670,10 @@ class LeaseAPI:
         
         # Parse the result
         result_vec = result.results[0].xdr.scval.obj.vec.scvec
-        rows = []
         
         # First element is the rows vector
-        if result_vec[0].obj.vec:
-            for row in result_vec[0].obj.vec.scvec:
-                row_tuple = row.obj.vec.scvec
-                id_val = int(row_tuple[0].obj.u64)
-                parent_val = int(row_tuple[1].obj.u64)
-                lessee_val = str(row_tuple[2].obj.address)
-                depth_val = int(row_tuple[3].obj.u32)
-                active_val = bool(row_tuple[4].obj.b)
-                
-                # Convert u64::MAX to None for parent
-                parent = None if parent_val == 2**64 - 1 else parent_val
-                
-                rows.append((id_val, parent, lessee_val, depth_val, active_val))
+        rows_vec = result_vec[0].obj.vec
+        rows = [_parse_tree_row(row) for row in rows_vec.scvec] if rows_vec else []
         
         # Second element is the next cursor
         next_cursor = int(result_vec[1].obj.u64)
@@ -467,42 +742,61 @@ class LeaseAPI:
             print(f"No lease tree found for root ID {root_id}")
             return
         
-        # Build parent->children map
-        from collections import defaultdict
-        children_map = defaultdict(list)
         node_data = {}
-        
         for (node_id, parent, lessee, depth, active) in rows:
             node_data[node_id] = (parent, lessee, depth, active)
-            if parent is not None:
-                children_map[parent].append(node_id)
         
-        def print_node(node_id: int, depth: int):
-            if node_id not in node_data:
-                return
-                
+        # Rows sorted by ID get dense positions 0..n-1, and the parent ->
+        # children map is stored CSR-style over those positions: the node at
+        # position p has children targets[offsets[p]:offsets[p + 1]]. Sized by
+        # the rows returned, not by the largest lease ID.
+        ids = sorted(node_data)
+        pos = {node_id: p for p, node_id in enumerate(ids)}
+        n = len(ids)
+        offsets = array('Q', bytes(8 * (n + 1)))
+        for node_id in ids:
+            parent = node_data[node_id][0]
+            if parent in pos:
+                offsets[pos[parent] + 1] += 1
+        for p in range(n):
+            offsets[p + 1] += offsets[p]
+        targets = array('Q', bytes(8 * offsets[n]))
+        fill = offsets[:n]
+        for p, node_id in enumerate(ids):
+            parent = node_data[node_id][0]
+            if parent in pos:
+                q = pos[parent]
+                targets[fill[q]] = p
+                fill[q] += 1
+        
+        # Collect lines and emit them in one write at the end
+        out = [f"\nLease Tree (Root: {root_id}) - Tree API", "=" * 60]
+        
+        # Iterative pre-order walk so deep chains don't recurse; children are
+        # pushed in reverse so they pop in ascending ID order
+        stack = [(pos[root_id], 0)] if root_id in pos else []
+        while stack:
+            p, depth = stack.pop()
+            node_id = ids[p]
+            
             parent, lessee, node_depth, active = node_data[node_id]
-            prefix = "  " * depth
+            prefix = _INDENTS[depth] if depth < len(_INDENTS) else "  " * depth
             
             # Format lessee address for display
             lessee_short = lessee[:8] + "..." if len(lessee) > 8 else lessee
             
             status = "🟢" if active else "⚪"
             
-            print(f"{prefix}├─ ID:{node_id} {status} depth:{node_depth}")
-            print(f"{prefix}   Lessee: {lessee_short}")
+            out.append(f"{prefix}├─ ID:{node_id} {status} depth:{node_depth}")
+            out.append(f"{prefix}   Lessee: {lessee_short}")
             
-            # Print children
-            for child_id in sorted(children_map.get(node_id, [])):
-                print_node(child_id, depth + 1)
-        
-        print(f"\nLease Tree (Root: {root_id}) - Tree API")
-        print("=" * 60)
-        print_node(root_id, 0)
-        print("\nLegend:")
-        print("🟢 = Active lease")
-        print("⚪ = Inactive lease")
-        print(f"Total nodes: {len(rows)}")
+            for child in reversed(targets[offsets[p]:offsets[p + 1]]):
+                stack.append((child, depth + 1))
+        out.append("\nLegend:")
+        out.append("🟢 = Active lease")
+        out.append("⚪ = Inactive lease")
+        out.append(f"Total nodes: {len(rows)}")
+        sys.stdout.write("\n".join(out) + "\n")
 
     def print_tree(self, root_id: int, indent: int = 0) -> None:
         """
@@ -512,36 +806,56 @@ class LeaseAPI:
             root_id: Root lease ID
             indent: Indentation level for printing
         """
-        def print_node(node_id: int, depth: int):
+        out = []
+        
+        # Display forms of addresses and terms hashes. A node's lessor is its
+        # parent's lessee and a tree usually shares one terms hash, so each
+        # distinct value is shortened once per print
+        short = {}
+        
+        def shorten(value: str, width: int) -> str:
+            text = short.get((value, width))
+            if text is None:
+                text = short[(value, width)] = value[:width] + "..." if len(value) > width else value
+            return text
+        
+        def render_node(node_id: int, depth: int):
             lease = self.get_lease(node_id)
-            prefix = "  " * depth
+            prefix = _INDENTS[depth] if depth < len(_INDENTS) else "  " * depth
             
             # Format addresses for display
-            lessor_short = lease['lessor'][:8] + "..." if len(lease['lessor']) > 8 else lease['lessor']
-            lessee_short = lease['lessee'][:8] + "..." if len(lease['lessee']) > 8 else lease['lessee']
+            lessor_short = shorten(lease['lessor'], 8)
+            lessee_short = shorten(lease['lessee'], 8)
             
             status = "✓" if lease['accepted'] else "○"
             active = "🟢" if lease['active'] else "⚪"
             
-            print(f"{prefix}├─ ID:{node_id} {status}{active} {lease['unit']}")
-            print(f"{prefix}   Lessor: {lessor_short}")
-            print(f"{prefix}   Lessee: {lessee_short}")
-            print(f"{prefix}   Depth: {lease['depth']}, Limit: {lease['limit']}")
-            print(f"{prefix}   Terms: {lease['terms'][:16]}...")
-            
-            # Print children
-            children = self.children_of(node_id)
-            for child_id in children:
-                print_node(child_id, depth + 1)
-        
-        print(f"\nLease Tree (Root: {root_id})")
-        print("=" * 50)
-        print_node(root_id, 0)
-        print("\nLegend:")
-        print("✓ = Accepted lease")
-        print("○ = Pending acceptance")
-        print("🟢 = Active lease")
-        print("⚪ = Inactive lease")
+            out.append(f"{prefix}├─ ID:{node_id} {status}{active} {lease['unit']}")
+            out.append(f"{prefix}   Lessor: {lessor_short}")
+            out.append(f"{prefix}   Lessee: {lessee_short}")
+            out.append(f"{prefix}   Depth: {lease['depth']}, Limit: {lease['limit']}")
+            out.append(f"{prefix}   Terms: {shorten(lease['terms'], 16)}")
+        
+        out.append(f"\nLease Tree (Root: {root_id})")
+        out.append("=" * 50)
+        
+        # Fetch the whole tree shape up front, then walk it locally
+        subtree = self.get_subtree(root_id)
+        
+        # Pre-order walk with an explicit stack; children are pushed in
+        # reverse so they pop (and print) in contract order
+        stack = [(root_id, 0)]
+        while stack:
+            node_id, depth = stack.pop()
+            render_node(node_id, depth)
+            for child_id in reversed(subtree[node_id]):
+                stack.append((child_id, depth + 1))
+        out.append("\nLegend:")
+        out.append("✓ = Accepted lease")
+        out.append("○ = Pending acceptance")
+        out.append("🟢 = Active lease")
+        out.append("⚪ = Inactive lease")
+        sys.stdout.write("\n".join(out) + "\n")
 
 
 def main():
@@ -6,26 +6,18 @@ This script tests the lease graph contract on testnet with error debugging.
 """
 
 import os
-import json
-import hashlib
-import binascii
 from dotenv import load_dotenv
 from stellar_sdk import Keypair, Network, Address, TransactionBuilder
 from stellar_sdk import SorobanServer
 from stellar_sdk import scval
 from stellar_sdk import xdr
+from common import generate_terms_digest
 
 load_dotenv()
 rpc = SorobanServer(os.environ["SOROBAN_RPC"])
 pp = Network.TESTNET_NETWORK_PASSPHRASE
 contract_id = "CDBFB6YDB55G7E5ZGOHYIYBLS745NVBU73TKLB6N6IT6XBKBWICNUW5I"
 
-def generate_terms_hash(terms_dict):
-    """Generate SHA-256 hash of canonical JSON terms"""
-    canon = json.dumps(terms_dict, separators=(',', ':'), sort_keys=True).encode()
-    h = hashlib.sha256(canon).digest()
-    return binascii.hexlify(h).decode()
-
 def decode_error_result(error_result_xdr):
     """Decode error result XDR to get more details"""
     try:
@@ -52,10 +44,9 @@ def main():
         "notice_days": 30,
         "penalty": "0.02"
     }
-    terms_hash_hex = generate_terms_hash(terms_dict)
-    terms_bytes = bytes.fromhex(terms_hash_hex)
+    terms_bytes = generate_terms_digest(terms_dict)
     
-    print(f"Terms Hash: {terms_hash_hex}")
+    print(f"Terms Hash: {terms_bytes.hex()}")
     
     # Load accounts
     landlord_account = rpc.load_account(landlord_kp.public_key)
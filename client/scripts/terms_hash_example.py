@@ -12,7 +12,7 @@ import os
 
 # Add the scripts directory to the path to import common
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from common import generate_terms_hash
+from common import canonical_terms, generate_terms_hash
 
 def main():
     # Example lease terms matching the canonical terms.json format
@@ -33,8 +33,7 @@ def main():
     print()
     
     print("Canonical JSON:")
-    canon = json.dumps(terms, separators=(',', ':'), sort_keys=True)
-    print(canon)
+    print(canonical_terms(terms).decode('utf-8'))
     print()
     
     # Generate hash using the common utility
@@ -14,17 +14,20 @@ import os
 import sys
 import time
 import json
+import copy
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from stellar_sdk import Server, Keypair, Network, TransactionBuilder
+from stellar_sdk import Server, Keypair, Network, StrKey, TransactionBuilder
 from stellar_sdk.exceptions import NotFoundError
 from stellar_sdk.operation import InvokeHostFunction
 from stellar_sdk.soroban import SorobanServer
-from stellar_sdk.soroban.soroban_rpc import GetTransactionStatus
-from stellar_sdk.xdr import SCVal, SCValType
+from stellar_sdk.soroban.soroban_rpc import GetTransactionStatus, SendTransactionStatus
+from stellar_sdk.xdr import SCVal, SCValType, TransactionMeta
 
 # Add the client scripts directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'scripts'))
-from common import actor_from_env, ensure_funded, balances
+from common import actor_from_env, ensure_funded, balances, batch_rpc
 
 load_dotenv()
 
@@ -33,6 +36,14 @@ HORIZON_URL = os.environ["HORIZON_URL"]
 NETWORK_PASSPHRASE = os.environ["NETWORK_PASSPHRASE"]
 SOROBAN_RPC_URL = os.environ.get("SOROBAN_RPC_URL", HORIZON_URL.replace("horizon", "soroban-rpc"))
 
+# Short auction window so the test waits seconds for the auction to
+# open and close instead of a minute and an hour
+AUCTION_START_DELAY = 5
+AUCTION_DURATION = 30
+
+# Compiled auction contract, relative to the working directory
+WASM_PATH = "target/wasm32-unknown-unknown/release/auction.wasm"
+
 # Initialize clients
 server = Server(HORIZON_URL)
 soroban_server = SorobanServer(SOROBAN_RPC_URL)
@@ -50,13 +61,107 @@ print(f"Network: {NETWORK_PASSPHRASE}")
 print(f"Horizon: {HORIZON_URL}")
 print(f"Soroban RPC: {SOROBAN_RPC_URL}")
 
+class AccountCache:
+    """
+    Load each source account once and reuse it across transactions.
+    
+    TransactionBuilder.build() bumps the account's sequence number in place,
+    so the cached Account stays in step with what has been submitted.
+    """
+    
+    def __init__(self, rpc):
+        self._rpc = rpc
+        self._accounts = {}
+    
+    def get(self, public_key):
+        account = self._accounts.get(public_key)
+        if account is None:
+            account = self._rpc.load_account(public_key)
+            self._accounts[public_key] = account
+        return account
+    
+    def invalidate(self, public_key):
+        self._accounts.pop(public_key, None)
+
+account_cache = AccountCache(soroban_server)
+
+def invoke(source_account, function_name, args, contract=None,
+           network_passphrase=NETWORK_PASSPHRASE, timeout=60):
+    """Build a single-operation InvokeHostFunction transaction"""
+    return (
+        TransactionBuilder(source_account, network_passphrase)
+        .add_operation(
+            InvokeHostFunction(
+                function=SCVal.from_string(function_name),
+                args=args,
+                source=contract,
+            )
+        )
+        .set_timeout(timeout)
+        .build()
+    )
+
+def poll_transaction(tx_hash, attempts=30, initial=0.1, factor=1.5, max_delay=3.0):
+    """Poll get_transaction with exponential backoff until it is final"""
+    result = None
+    delay = initial
+    for _ in range(attempts):
+        result = soroban_server.get_transaction(tx_hash)
+        if result.status in (GetTransactionStatus.SUCCESS, GetTransactionStatus.FAILED):
+            return result
+        time.sleep(delay)
+        delay = min(max_delay, delay * factor)
+    return result
+
+def send_and_poll(tx):
+    """Submit a signed transaction and wait for its final status"""
+    send_result = soroban_server.send_transaction(tx)
+    if send_result.status == SendTransactionStatus.ERROR:
+        result = send_result
+    else:
+        result = poll_transaction(send_result.hash)
+    if result.status != GetTransactionStatus.SUCCESS:
+        # The sequence number may not have been consumed; reload next time
+        account_cache.invalidate(tx.transaction.source.account_id)
+    return result
+
+def contract_address_from_result(result):
+    """Extract the new contract's address from a successful create_contract result"""
+    meta = TransactionMeta.from_xdr(result.result_meta_xdr)
+    # Soroban results are in v3 meta, or v4 on protocol 23+ (newer SDKs only)
+    versioned = meta.v3 if meta.v == 3 else getattr(meta, "v4", None) if meta.v == 4 else None
+    soroban_meta = versioned.soroban_meta if versioned is not None else None
+    return_value = soroban_meta.return_value if soroban_meta is not None else None
+    if return_value is None or return_value.address is None:
+        raise ValueError(f"create_contract result has no contract address (meta v{meta.v})")
+    return StrKey.encode_contract(return_value.address.contract_id.hash)
+
+def wait_until(ts):
+    """Sleep until the given unix timestamp has passed"""
+    remaining = ts - int(time.time())
+    if remaining > 0:
+        time.sleep(remaining + 1)
+
+@functools.lru_cache(maxsize=None)
+def load_wasm_scval():
+    """Read and encode the contract WASM once per run (None if not built)"""
+    if not os.path.exists(WASM_PATH):
+        return None
+    with open(WASM_PATH, "rb") as f:
+        return SCVal.from_bytes(f.read())
+
 def ensure_all_funded():
     """Ensure all accounts are funded"""
     print("\n1. Ensuring all accounts are funded...")
-    ensure_funded(landlord.kp.public_key)
-    ensure_funded(tenant.kp.public_key)
-    ensure_funded(bidder1_kp.public_key)
-    ensure_funded(bidder2_kp.public_key)
+    public_keys = [
+        landlord.kp.public_key,
+        tenant.kp.public_key,
+        bidder1_kp.public_key,
+        bidder2_kp.public_key,
+    ]
+    # Friendbot requests are independent; fund all accounts at once
+    with ThreadPoolExecutor(max_workers=len(public_keys)) as executor:
+        list(executor.map(ensure_funded, public_keys))
     print("✅ All accounts funded!")
 
 def deploy_auction_contract():
@@ -64,60 +169,37 @@ def deploy_auction_contract():
     print("\n2. Deploying auction contract...")
     
     # Read the compiled WASM file
-    wasm_path = "target/wasm32-unknown-unknown/release/auction.wasm"
-    if not os.path.exists(wasm_path):
-        print(f"❌ WASM file not found at {wasm_path}")
+    wasm_scval = load_wasm_scval()
+    if wasm_scval is None:
+        print(f"❌ WASM file not found at {WASM_PATH}")
         print("Please build the contract first: cargo build --release --target wasm32-unknown-unknown -p auction")
         return None
     
-    with open(wasm_path, "rb") as f:
-        wasm_bytes = f.read()
-    
     # Install contract code
-    source_account = soroban_server.load_account(tenant.kp.public_key)
+    source_account = account_cache.get(tenant.kp.public_key)
     
-    install_tx = (
-        TransactionBuilder(source_account, NETWORK_PASSPHRASE)
-        .add_operation(
-            InvokeHostFunction(
-                function=SCVal.from_string("install_contract_code"),
-                args=[SCVal.from_bytes(wasm_bytes)],
-            )
-        )
-        .set_timeout(300)
-        .build()
-    )
+    install_tx = invoke(source_account, "install_contract_code", [wasm_scval])
     
     install_tx.sign(tenant.kp)
-    install_result = soroban_server.send_transaction(install_tx)
+    install_result = send_and_poll(install_tx)
     
     if install_result.status == GetTransactionStatus.SUCCESS:
         print(f"✅ Contract code installed! Transaction: {install_result.hash}")
         
         # Create contract instance
-        create_tx = (
-            TransactionBuilder(source_account, NETWORK_PASSPHRASE)
-            .add_operation(
-                InvokeHostFunction(
-                    function=SCVal.from_string("create_contract"),
-                    args=[
-                        SCVal.from_address(tenant.kp.public_key),  # deployer
-                        SCVal.from_string("auction"),  # salt
-                        SCVal.from_string("install_contract_code"),  # wasm_hash
-                    ],
-                )
-            )
-            .set_timeout(300)
-            .build()
-        )
+        create_tx = invoke(source_account, "create_contract", [
+            SCVal.from_address(tenant.kp.public_key),  # deployer
+            SCVal.from_string("auction"),  # salt
+            SCVal.from_string("install_contract_code"),  # wasm_hash
+        ])
         
         create_tx.sign(tenant.kp)
-        create_result = soroban_server.send_transaction(create_tx)
+        create_result = send_and_poll(create_tx)
         
         if create_result.status == GetTransactionStatus.SUCCESS:
-            print(f"✅ Contract instance created! Transaction: {create_result.hash}")
-            # Extract contract address from result (simplified)
-            return "CAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAITA4"  # Mock address
+            contract_address = contract_address_from_result(create_result)
+            print(f"✅ Contract instance created at {contract_address}! Transaction: {create_result.hash}")
+            return contract_address
         else:
             print(f"❌ Failed to create contract instance: {create_result}")
             return None
@@ -125,42 +207,27 @@ def deploy_auction_contract():
         print(f"❌ Failed to install contract code: {install_result}")
         return None
 
-def create_test_auction(contract_address):
+def create_test_auction(contract_address, start_ts, end_ts):
     """Create a test auction"""
     print("\n3. Creating test auction...")
     
-    current_time = int(time.time())
-    start_ts = current_time + 60  # Start in 1 minute
-    end_ts = current_time + 3600  # End in 1 hour
+    source_account = account_cache.get(tenant.kp.public_key)
     
-    source_account = soroban_server.load_account(tenant.kp.public_key)
-    
-    tx = (
-        TransactionBuilder(source_account, NETWORK_PASSPHRASE)
-        .add_operation(
-            InvokeHostFunction(
-                function=SCVal.from_string("create"),
-                args=[
-                    SCVal.from_u64(1),  # lease_id
-                    SCVal.from_string("unit:NYC:123-A"),  # unit
-                    SCVal.from_address(tenant.kp.public_key),  # seller
-                    SCVal.from_address("CAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAITA4"),  # token (mock)
-                    SCVal.from_i128(100),  # reserve price
-                    SCVal.from_i128(10),  # min_increment
-                    SCVal.from_u64(start_ts),  # start_ts
-                    SCVal.from_u64(end_ts),  # end_ts
-                    SCVal.from_u64(60),  # extend_secs
-                    SCVal.from_u64(30),  # extend_window
-                ],
-                source=contract_address,
-            )
-        )
-        .set_timeout(300)
-        .build()
-    )
+    tx = invoke(source_account, "create", [
+        SCVal.from_u64(1),  # lease_id
+        SCVal.from_string("unit:NYC:123-A"),  # unit
+        SCVal.from_address(tenant.kp.public_key),  # seller
+        SCVal.from_address("CAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAAITA4"),  # token (mock)
+        SCVal.from_i128(100),  # reserve price
+        SCVal.from_i128(10),  # min_increment
+        SCVal.from_u64(start_ts),  # start_ts
+        SCVal.from_u64(end_ts),  # end_ts
+        SCVal.from_u64(60),  # extend_secs
+        SCVal.from_u64(30),  # extend_window
+    ], contract=contract_address)
     
     tx.sign(tenant.kp)
-    result = soroban_server.send_transaction(tx)
+    result = send_and_poll(tx)
     
     if result.status == GetTransactionStatus.SUCCESS:
         print(f"✅ Auction created successfully! Transaction: {result.hash}")
@@ -173,60 +240,37 @@ def test_auction_queries(contract_address, auction_id):
     """Test auction query functions"""
     print("\n4. Testing auction queries...")
     
-    source_account = soroban_server.load_account(tenant.kp.public_key)
+    # Simulation-only transactions never consume a sequence number, so build
+    # them from a copy to keep the cached account in step
+    source_account = copy.copy(account_cache.get(tenant.kp.public_key))
     
-    # Test get_auction
-    tx = (
-        TransactionBuilder(source_account, NETWORK_PASSPHRASE)
-        .add_operation(
-            InvokeHostFunction(
-                function=SCVal.from_string("get_auction"),
-                args=[SCVal.from_u64(auction_id)],
-                source=contract_address,
-            )
-        )
-        .set_timeout(300)
-        .build()
-    )
-    
-    tx.sign(tenant.kp)
-    result = soroban_server.send_transaction(tx)
-    
-    if result.status == GetTransactionStatus.SUCCESS:
-        print(f"✅ get_auction query successful! Transaction: {result.hash}")
-    else:
-        print(f"❌ get_auction query failed: {result}")
+    # Both queries are read-only, so simulate them together in one batch
+    # request instead of submitting and polling two transactions
+    query_names = ["get_auction", "get_status"]
+    calls = []
+    for function_name in query_names:
+        tx = invoke(source_account, function_name, [SCVal.from_u64(auction_id)], contract=contract_address)
+        calls.append(("simulateTransaction", {"transaction": tx.to_xdr()}))
     
-    # Test get_status
-    tx = (
-        TransactionBuilder(source_account, NETWORK_PASSPHRASE)
-        .add_operation(
-            InvokeHostFunction(
-                function=SCVal.from_string("get_status"),
-                args=[SCVal.from_u64(auction_id)],
-                source=contract_address,
-            )
-        )
-        .set_timeout(300)
-        .build()
-    )
-    
-    tx.sign(tenant.kp)
-    result = soroban_server.send_transaction(tx)
-    
-    if result.status == GetTransactionStatus.SUCCESS:
-        print(f"✅ get_status query successful! Transaction: {result.hash}")
-    else:
-        print(f"❌ get_status query failed: {result}")
+    for function_name, response in zip(query_names, batch_rpc(SOROBAN_RPC_URL, calls)):
+        error = response.get("error") or response.get("result", {}).get("error")
+        if error:
+            print(f"❌ {function_name} query failed: {error}")
+        else:
+            print(f"✅ {function_name} query successful!")
 
-def simulate_bidding(contract_address, auction_id):
+def simulate_bidding(contract_address, auction_id, start_ts):
     """Simulate bidding process"""
     print("\n5. Simulating bidding process...")
     
     # Wait for auction to start
     print("⏳ Waiting for auction to start...")
-    time.sleep(65)  # Wait 1 minute + 5 seconds
+    wait_until(start_ts)
     
+    # No bids are submitted yet (they need a deployed token). When they are,
+    # each bidder signs from its own account, so their submissions are
+    # independent and can be sent concurrently; the tenant's own transactions
+    # must stay serial because they share one sequence number.
     print("📝 Note: In a real test, you would:")
     print("   1. Deploy a token contract")
     print("   2. Mint tokens to bidders")
@@ -236,35 +280,24 @@ def simulate_bidding(contract_address, auction_id):
     
     print("✅ Bidding simulation completed (mock)")
 
-def test_finalization(contract_address, auction_id):
+def test_finalization(contract_address, auction_id, end_ts):
     """Test auction finalization"""
     print("\n6. Testing auction finalization...")
     
     # Wait for auction to end
     print("⏳ Waiting for auction to end...")
-    time.sleep(3600)  # Wait 1 hour
+    wait_until(end_ts)
     
-    source_account = soroban_server.load_account(tenant.kp.public_key)
+    source_account = account_cache.get(tenant.kp.public_key)
     
-    tx = (
-        TransactionBuilder(source_account, NETWORK_PASSPHRASE)
-        .add_operation(
-            InvokeHostFunction(
-                function=SCVal.from_string("finalize"),
-                args=[
-                    SCVal.from_u64(auction_id),
-                    SCVal.from_address(landlord.kp.public_key),  # lessor
-                    SCVal.from_address(bidder1_kp.public_key),  # new_lessee (winner)
-                ],
-                source=contract_address,
-            )
-        )
-        .set_timeout(300)
-        .build()
-    )
+    tx = invoke(source_account, "finalize", [
+        SCVal.from_u64(auction_id),
+        SCVal.from_address(landlord.kp.public_key),  # lessor
+        SCVal.from_address(bidder1_kp.public_key),  # new_lessee (winner)
+    ], contract=contract_address)
     
     tx.sign(tenant.kp)
-    result = soroban_server.send_transaction(tx)
+    result = send_and_poll(tx)
     
     if result.status == GetTransactionStatus.SUCCESS:
         print(f"✅ Auction finalized successfully! Transaction: {result.hash}")
@@ -288,7 +321,9 @@ def main():
             return
         
         # Step 3: Create auction
-        auction_id = create_test_auction(contract_address)
+        start_ts = int(time.time()) + AUCTION_START_DELAY
+        end_ts = start_ts + AUCTION_DURATION
+        auction_id = create_test_auction(contract_address, start_ts, end_ts)
         if not auction_id:
             print("❌ Auction creation failed. Exiting.")
             return
@@ -297,10 +332,10 @@ def main():
         test_auction_queries(contract_address, auction_id)
         
         # Step 5: Simulate bidding
-        simulate_bidding(contract_address, auction_id)
+        simulate_bidding(contract_address, auction_id, start_ts)
         
         # Step 6: Test finalization
-        success = test_finalization(contract_address, auction_id)
+        success = test_finalization(contract_address, auction_id, end_ts)
         
         if success:
             print("\n🎉 Auction Contract Test Completed Successfully!")
@@ -4,13 +4,16 @@ Simple Auction Contract Logic Test
 
 This script tests the auction contract logic by simulating the contract behavior
 without requiring a full Stellar network deployment.
+
+The mock is plain Python with no compiled dependencies, so long randomized runs
+can use it unmodified under PyPy (pass record_events=False to skip event tuples).
 """
 
-import time
+from collections import deque
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Deque, Dict
 
-@dataclass
+@dataclass(slots=True)
 class Auction:
     """Represents an auction"""
     id: int
@@ -31,7 +34,7 @@ class Auction:
     second_bid: int
     settled: bool
 
-@dataclass
+@dataclass(slots=True)
 class Bid:
     """Represents a bid"""
     auction_id: int
@@ -39,14 +42,29 @@ class Bid:
     amount: int
     timestamp: int
 
+class FakeClock:
+    """Deterministic clock so scenarios don't depend on time.time()"""
+    
+    def __init__(self, t0: int = 1_700_000_000):
+        self.t = t0
+    
+    def now(self) -> int:
+        return self.t
+    
+    def advance(self, dt: int) -> int:
+        self.t += dt
+        return self.t
+
 class AuctionContract:
     """Mock auction contract for testing"""
     
-    def __init__(self):
+    def __init__(self, record_events: bool = True, max_events: int = 10_000):
         self.auctions: Dict[int, Auction] = {}
-        self.bids: Dict[tuple, int] = {}  # (auction_id, bidder) -> total_amount
+        self.bids: Dict[int, Dict[str, int]] = {}  # auction_id -> bidder -> total_amount
         self.next_id = 1
-        self.events: List[tuple] = []
+        # Most recent events only; stress runs can turn recording off entirely
+        self.record_events = record_events
+        self.events: Deque[tuple] = deque(maxlen=max_events)
     
     def create(self, lease_id: int, unit: str, seller: str, token: str, 
                reserve: int, min_increment: int, start_ts: int, end_ts: int,
@@ -88,43 +106,47 @@ class AuctionContract:
         )
         
         self.auctions[auction_id] = auction
-        self.events.append(("AucCreate", auction_id, lease_id, seller, unit, reserve))
+        if self.record_events:
+            self.events.append(("AucCreate", auction_id, lease_id, seller, unit, reserve))
         
         return auction_id
     
     def bid(self, auction_id: int, bidder: str, amount: int, current_time: int) -> bool:
         """Place a bid on an auction"""
-        if amount <= 0:
-            raise ValueError("invalid-amount")
+        auction = self.auctions.get(auction_id)
         
-        if auction_id not in self.auctions:
-            raise ValueError("auction-not-found")
-        
-        auction = self.auctions[auction_id]
-        
-        # Validation
-        if auction.settled:
-            raise ValueError("auction-settled")
-        if current_time < auction.start_ts:
-            raise ValueError("auction-not-started")
-        if current_time > auction.end_ts:
+        # Validation: one combined test on the common (valid) path; only a
+        # rejected bid pays for working out which check failed
+        if amount <= 0 or auction is None or auction.settled or not (auction.start_ts <= current_time <= auction.end_ts):
+            if amount <= 0:
+                raise ValueError("invalid-amount")
+            if auction is None:
+                raise ValueError("auction-not-found")
+            if auction.settled:
+                raise ValueError("auction-settled")
+            if current_time < auction.start_ts:
+                raise ValueError("auction-not-started")
             raise ValueError("auction-ended")
         
-        # Update bidder's total escrowed amount
-        current_bid = self.bids.get((auction_id, bidder), 0)
-        new_total = current_bid + amount
-        self.bids[(auction_id, bidder)] = new_total
+        # Compute bidder's new total escrowed amount
+        auction_bids = self.bids.setdefault(auction_id, {})
+        new_total = auction_bids.get(bidder, 0) + amount
         
-        # Check if bid meets requirements
+        # Check if bid meets requirements (a rejected bid escrows nothing,
+        # matching the contract, where the panic reverts the transfer)
         if new_total < auction.reserve:
             raise ValueError("below-reserve")
         if new_total < auction.best_bid + auction.min_increment:
             raise ValueError("insufficient-increment")
         
-        # Update auction state
-        auction.second_bid = auction.best_bid
+        auction_bids[bidder] = new_total
+        
+        # Update auction state. The leader topping up their own bid doesn't
+        # change the runner-up, so second_bid only moves on a new leader.
+        if bidder != auction.best_bidder:
+            auction.second_bid = auction.best_bid
+            auction.best_bidder = bidder
         auction.best_bid = new_total
-        auction.best_bidder = bidder
         
         # Anti-sniping: extend auction if bid is within extend_window
         if auction.extensions_count < auction.max_extensions:
@@ -132,9 +154,11 @@ class AuctionContract:
             if time_remaining <= auction.extend_window:
                 auction.end_ts += auction.extend_secs
                 auction.extensions_count += 1
-                self.events.append(("AucExtend", auction_id, auction.end_ts))
+                if self.record_events:
+                    self.events.append(("AucExtend", auction_id, auction.end_ts))
         
-        self.events.append(("BidPlaced", auction_id, bidder, new_total, current_time, auction.end_ts))
+        if self.record_events:
+            self.events.append(("BidPlaced", auction_id, bidder, new_total, current_time, auction.end_ts))
         return True
     
     def finalize(self, auction_id: int, lessor: str, new_lessee: str, current_time: int) -> bool:
@@ -150,38 +174,42 @@ class AuctionContract:
         if current_time < auction.end_ts:
             raise ValueError("auction-not-ended")
         
+        # Take this auction's escrow out of the bid book
+        auction_bids = self.bids.pop(auction_id, {})
+        
         # Check if reserve was met
         if auction.best_bid < auction.reserve:
             # Refund all bidders
-            for (_, bidder), amount in self.bids.items():
-                if amount > 0:
+            for bidder, amount in auction_bids.items():
+                if amount > 0 and self.record_events:
                     self.events.append(("Refund", auction_id, bidder, amount))
             
             auction.settled = True
-            self.events.append(("AucFailed", auction_id, auction.reserve))
+            if self.record_events:
+                self.events.append(("AucFailed", auction_id, auction.reserve))
             return False
         
         # Calculate clearing price (second price)
         clearing_price = max(auction.second_bid, auction.reserve)
         
         # Simulate payments
-        self.events.append(("Payment", "seller", auction.seller, clearing_price))
+        if self.record_events:
+            self.events.append(("Payment", "seller", auction.seller, clearing_price))
         
-        # Refund winner (best_bid - clearing_price)
-        winner_refund = auction.best_bid - clearing_price
-        if winner_refund > 0:
+        # Refund winner (escrow - clearing_price)
+        winner_refund = auction_bids.pop(auction.best_bidder, 0) - clearing_price
+        if winner_refund > 0 and self.record_events:
             self.events.append(("Refund", auction_id, auction.best_bidder, winner_refund))
         
-        # Refund all other bidders
-        for (_, bidder), amount in self.bids.items():
-            if bidder != auction.best_bidder and amount > 0:
+        # Refund all other bidders; with the winner popped, everything left
+        # is a losing bid (only accepted, positive bids are ever escrowed)
+        if self.record_events:
+            for bidder, amount in auction_bids.items():
                 self.events.append(("Refund", auction_id, bidder, amount))
         
-        # Clear bids for this auction
-        self.bids = {k: v for k, v in self.bids.items() if k[0] != auction_id}
-        
         auction.settled = True
-        self.events.append(("AucFinal", auction_id, auction.best_bidder, clearing_price, auction.lease_id))
+        if self.record_events:
+            self.events.append(("AucFinal", auction_id, auction.best_bidder, clearing_price, auction.lease_id))
         
         return True
     
@@ -201,13 +229,15 @@ class AuctionContract:
             raise ValueError("cannot-cancel-with-bids")
         
         # Refund any existing bids
+        auction_bids = self.bids.pop(auction_id, {})
         if has_bids:
-            for (_, bidder), amount in self.bids.items():
-                if amount > 0:
+            for bidder, amount in auction_bids.items():
+                if amount > 0 and self.record_events:
                     self.events.append(("Refund", auction_id, bidder, amount))
         
         auction.settled = True
-        self.events.append(("AucCancel", auction_id))
+        if self.record_events:
+            self.events.append(("AucCancel", auction_id))
         return True
     
     def get_auction(self, auction_id: int) -> Auction:
@@ -218,7 +248,7 @@ class AuctionContract:
     
     def get_bid(self, auction_id: int, bidder: str) -> int:
         """Get bidder's current escrowed amount"""
-        return self.bids.get((auction_id, bidder), 0)
+        return self.bids.get(auction_id, {}).get(bidder, 0)
     
     def get_status(self, auction_id: int, current_time: int) -> str:
         """Get auction status"""
@@ -238,7 +268,8 @@ def test_happy_path():
     print("Testing Happy Path Scenario")
     
     contract = AuctionContract()
-    current_time = int(time.time())
+    clock = FakeClock()
+    current_time = clock.now()
     
     # Create auction
     auction_id = contract.create(
@@ -257,46 +288,43 @@ def test_happy_path():
     print(f"Created auction {auction_id}")
     
     # Place bids
-    contract.bid(auction_id, "bidder1", 150, current_time + 120)
+    contract.bid(auction_id, "bidder1", 150, clock.advance(120))
     print("Bidder1 placed bid of 150")
     
-    contract.bid(auction_id, "bidder2", 200, current_time + 180)
+    contract.bid(auction_id, "bidder2", 200, clock.advance(60))
     print("Bidder2 placed bid of 200")
     
-    contract.bid(auction_id, "bidder1", 60, current_time + 240)  # Total: 210 (150+60)
+    contract.bid(auction_id, "bidder1", 60, clock.advance(60))  # Total: 210 (150+60)
     print("Bidder1 increased bid to 210 total")
     
-    contract.bid(auction_id, "bidder2", 50, current_time + 300)  # Total: 250 (200+50)
+    contract.bid(auction_id, "bidder2", 50, clock.advance(60))  # Total: 250 (200+50)
     print("Bidder2 increased bid to 250 total")
     
     # Finalize auction
-    success = contract.finalize(auction_id, "lessor", "bidder2", current_time + 3700)
-    
-    if success:
-        auction = contract.get_auction(auction_id)
-        print(f"Auction finalized successfully!")
-        print(f"   Winner: {auction.best_bidder}")
-        print(f"   Best bid: {auction.best_bid}")
-        print(f"   Second bid: {auction.second_bid}")
-        print(f"   Clearing price: {max(auction.second_bid, auction.reserve)}")
-        
-        # Verify second-price auction
-        clearing_price = max(auction.second_bid, auction.reserve)
-        assert clearing_price == 210, f"Expected clearing price 210, got {clearing_price}"
-        assert auction.best_bidder == "bidder2", f"Expected winner bidder2, got {auction.best_bidder}"
-        
-        print("Second-price auction working correctly!")
-    else:
-        print("Auction finalization failed")
+    success = contract.finalize(auction_id, "lessor", "bidder2", clock.advance(3400))
+    assert success, "Auction finalization failed"
     
-    return success
+    auction = contract.get_auction(auction_id)
+    print(f"Auction finalized successfully!")
+    print(f"   Winner: {auction.best_bidder}")
+    print(f"   Best bid: {auction.best_bid}")
+    print(f"   Second bid: {auction.second_bid}")
+    print(f"   Clearing price: {max(auction.second_bid, auction.reserve)}")
+    
+    # Verify second-price auction
+    clearing_price = max(auction.second_bid, auction.reserve)
+    assert clearing_price == 210, f"Expected clearing price 210, got {clearing_price}"
+    assert auction.best_bidder == "bidder2", f"Expected winner bidder2, got {auction.best_bidder}"
+    
+    print("Second-price auction working correctly!")
 
 def test_reserve_not_met():
     """Test scenario where reserve is not met"""
     print("\nTesting Reserve Not Met Scenario")
     
     contract = AuctionContract()
-    current_time = int(time.time())
+    clock = FakeClock()
+    current_time = clock.now()
     
     # Create auction
     auction_id = contract.create(
@@ -316,23 +344,20 @@ def test_reserve_not_met():
     
     # Place bid below reserve
     try:
-        contract.bid(auction_id, "bidder1", 50, current_time + 120)
-        print("ERROR: Bid below reserve should have failed")
-        return False
+        contract.bid(auction_id, "bidder1", 50, clock.advance(120))
     except ValueError as e:
-        if "below-reserve" in str(e):
-            print("Bid below reserve correctly rejected")
-            return True
-        else:
-            print(f"Unexpected error: {e}")
-            return False
+        assert "below-reserve" in str(e), f"Unexpected error: {e}"
+        print("Bid below reserve correctly rejected")
+    else:
+        raise AssertionError("Bid below reserve should have failed")
 
 def test_anti_sniping():
     """Test anti-sniping extension"""
     print("\nTesting Anti-Sniping Extension")
     
     contract = AuctionContract()
-    current_time = int(time.time())
+    clock = FakeClock()
+    current_time = clock.now()
     
     # Create auction with short duration
     auction_id = contract.create(
@@ -351,7 +376,7 @@ def test_anti_sniping():
     print(f"Created auction {auction_id}")
     
     # Place bid within extend_window (5 seconds before end)
-    bid_time = current_time + 115
+    bid_time = clock.advance(115)
     contract.bid(auction_id, "bidder1", 150, bid_time)
     print("Bidder1 placed bid within extend_window")
     
@@ -365,14 +390,14 @@ def test_anti_sniping():
     assert auction.extensions_count == 1, f"Expected 1 extension, got {auction.extensions_count}"
     
     print("Anti-sniping extension working correctly!")
-    return True
 
 def test_cancel_before_start():
     """Test cancellation before auction starts"""
     print("\nTesting Cancel Before Start")
     
     contract = AuctionContract()
-    current_time = int(time.time())
+    clock = FakeClock()
+    current_time = clock.now()
     
     # Create auction
     auction_id = contract.create(
@@ -391,17 +416,121 @@ def test_cancel_before_start():
     print(f"Created auction {auction_id}")
     
     # Cancel before start
-    contract.cancel(auction_id, current_time + 30)
+    contract.cancel(auction_id, clock.advance(30))
     print("Cancelled auction before start")
     
     auction = contract.get_auction(auction_id)
     assert auction.settled, "Auction should be settled after cancellation"
     
     print("Cancel before start working correctly!")
-    return True
+
+def test_leader_raises_own_bid():
+    """Test that the leader topping up doesn't become their own second price"""
+    print("\nTesting Leader Raises Own Bid")
+    
+    contract = AuctionContract()
+    clock = FakeClock()
+    current_time = clock.now()
+    
+    auction_id = contract.create(
+        lease_id=7,
+        unit="unit:NYC:777-G",
+        seller="seller777",
+        token="token777",
+        reserve=100,
+        min_increment=10,
+        start_ts=current_time + 60,
+        end_ts=current_time + 3600,
+        extend_secs=60,
+        extend_window=30
+    )
+    
+    contract.bid(auction_id, "bidder1", 150, clock.advance(120))
+    contract.bid(auction_id, "bidder2", 200, clock.advance(60))
+    contract.bid(auction_id, "bidder2", 100, clock.advance(60))  # Total: 300, still leading
+    
+    auction = contract.get_auction(auction_id)
+    print(f"   Best bid: {auction.best_bid}, Second bid: {auction.second_bid}")
+    assert auction.best_bid == 300, f"Expected best bid 300, got {auction.best_bid}"
+    assert auction.second_bid == 150, f"Expected second bid 150, got {auction.second_bid}"
+    
+    print("Second price tracks the runner-up correctly!")
+
+def test_rejected_bid_not_escrowed():
+    """Test that a rejected bid leaves nothing in escrow"""
+    print("\nTesting Rejected Bid Not Escrowed")
+    
+    contract = AuctionContract()
+    clock = FakeClock()
+    current_time = clock.now()
+    
+    auction_id = contract.create(
+        lease_id=8,
+        unit="unit:NYC:888-H",
+        seller="seller888",
+        token="token888",
+        reserve=100,
+        min_increment=10,
+        start_ts=current_time + 60,
+        end_ts=current_time + 3600,
+        extend_secs=60,
+        extend_window=30
+    )
+    
+    contract.bid(auction_id, "bidder1", 150, clock.advance(120))
+    
+    # The contract's panic reverts the transfer, so nothing may stay escrowed
+    try:
+        contract.bid(auction_id, "bidder2", 120, clock.advance(60))
+    except ValueError as e:
+        assert "insufficient-increment" in str(e), f"Unexpected error: {e}"
+        print("Bid below the increment correctly rejected")
+    assert contract.get_bid(auction_id, "bidder2") == 0, "Rejected bid should not be escrowed"
+    
+    print("Rejected bids escrow nothing!")
+
+def test_independent_auctions():
+    """Test that finalizing one auction leaves other auctions' bids alone"""
+    print("\nTesting Independent Auctions")
+    
+    contract = AuctionContract()
+    clock = FakeClock()
+    current_time = clock.now()
+    
+    auction_ids = [
+        contract.create(
+            lease_id=lease_id,
+            unit=f"unit:NYC:{lease_id}",
+            seller="seller",
+            token="token",
+            reserve=100,
+            min_increment=10,
+            start_ts=current_time + 60,
+            end_ts=current_time + 3600,
+            extend_secs=60,
+            extend_window=30
+        )
+        for lease_id in (5, 6)
+    ]
+    first, second = auction_ids
+    
+    contract.bid(first, "bidder1", 150, clock.advance(120))
+    contract.bid(first, "bidder2", 200, clock.advance(60))
+    contract.bid(second, "bidder3", 300, clock.advance(60))
+    
+    contract.finalize(first, "lessor", "bidder2", clock.advance(3460))
+    print(f"Finalized auction {first}")
+    
+    refunds = [e for e in contract.events if e[0] == "Refund"]
+    expected = [("Refund", first, "bidder2", 50), ("Refund", first, "bidder1", 150)]
+    assert refunds == expected, f"Unexpected refunds: {refunds}"
+    assert contract.get_bid(first, "bidder1") == 0, "Finalized auction escrow should be cleared"
+    assert contract.get_bid(second, "bidder3") == 300, "Other auction escrow should be untouched"
+    
+    print("Auctions settle independently!")
 
 def main():
-    """Run all tests"""
+    """Run all tests; each raises AssertionError on failure"""
     print("Starting Auction Contract Logic Tests")
     print("=" * 50)
     
@@ -410,6 +539,9 @@ def main():
         ("Reserve Not Met", test_reserve_not_met),
         ("Anti-Sniping", test_anti_sniping),
         ("Cancel Before Start", test_cancel_before_start),
+        ("Leader Raises Own Bid", test_leader_raises_own_bid),
+        ("Rejected Bid Not Escrowed", test_rejected_bid_not_escrowed),
+        ("Independent Auctions", test_independent_auctions),
     ]
     
     passed = 0
@@ -417,11 +549,11 @@ def main():
     
     for test_name, test_func in tests:
         try:
-            if test_func():
-                passed += 1
-                print(f"PASSED: {test_name}")
-            else:
-                print(f"FAILED: {test_name}")
+            test_func()
+            passed += 1
+            print(f"PASSED: {test_name}")
+        except AssertionError as e:
+            print(f"FAILED: {test_name} - {e}")
         except Exception as e:
             print(f"ERROR: {test_name} - {e}")
     
@@ -5,81 +5,100 @@ Lease Graph Tree Visualization
 This script displays the lease tree structure created on testnet.
 """
 
+import sys
+
+CONTRACT_ID = "CDBFB6YDB55G7E5ZGOHYIYBLS745NVBU73TKLB6N6IT6XBKBWICNUW5I"
+TERMS_HASH = "dd759fa56986118f97909286aef8d20878f2e23fef094d0121b551e4eabe8a37"
+
+LANDLORD = ("GBAK4TXOUV5XFLWDE6IUIZYYVFQXLY4LNWNSDGNFH27NUKDUOCHGHEZX", "Landlord")
+MASTER_TENANT = ("GC773P7BXH2I2MPHHYTDCRM66EBLEUUBSKHXN47E65Q6BAZ2DZVA6UQY", "Master Tenant")
+SUBTENANT_1 = ("GDIMDTIVGQHEDZQNRAOXT5VXVTUQ6CU2ZDBV7YMNJAEET7QNMMIEWE7Y", "Subtenant 1")
+SUBTENANT_2 = ("GA27H6G7UFTND5MLOB6ORUXWRGXD3SMZKIBPKKRXM5AVZZ5NM76TVAV3", "Subtenant 2")
+
+# (id, title, lessor, lessee, unit, depth, limit, status, terms), root first
+NODES = [
+    (1, "Master Lease (Root)", LANDLORD, MASTER_TENANT, "unit", 0, 2, "Accepted", TERMS_HASH),
+    (2, "Sublease (Level 1)", MASTER_TENANT, SUBTENANT_1, "unit", 1, 1, "Pending acceptance", TERMS_HASH),
+    (3, "Sublease (Level 1)", MASTER_TENANT, SUBTENANT_2, "unit", 1, 1, "Pending acceptance", TERMS_HASH),
+]
+
+RULE = "=" * 60
+
+HEADER = "\n".join([
+    RULE,
+    "LEASE GRAPH TREE STRUCTURE",
+    RULE,
+    "",
+    f"Contract ID: {CONTRACT_ID}",
+    "Network: Testnet",
+    "",
+    "TREE STRUCTURE:",
+])
+
+FOOTER = "\n".join([
+    RULE,
+    "EVENTS EMITTED",
+    RULE,
+    "1. LeaseCreated: (unit, 1) -> Master Tenant",
+    "2. LeaseAccepted: (1) -> void",
+    "3. SubleaseCreated: (1, 2) -> Subtenant 1",
+    "4. SubleaseCreated: (1, 3) -> Subtenant 2",
+    "",
+    RULE,
+    "KEY FEATURES DEMONSTRATED",
+    RULE,
+    "- ID-based parent/child relationships",
+    "- Terms validation (hash-based)",
+    "- Acceptance control workflow",
+    "- Branching limits enforcement",
+    "- Depth tracking (0, 1)",
+    "- Event emission for indexers",
+    "- Authorization (only lessee can create subleases)",
+    "- Unlimited sublease depth support",
+    "",
+    RULE,
+    "NEXT STEPS",
+    RULE,
+    "1. Accept subleases (IDs 2, 3) to activate them",
+    "2. Create third-level subleases from accepted subtenants",
+    "3. Test terms mismatch rejection",
+    "4. Test limit enforcement",
+    "5. Add query functions for tree traversal",
+    "6. Integrate with insurance/utility systems",
+    "",
+    "Contract Explorer:",
+    f"https://stellar.expert/explorer/testnet/contract/{CONTRACT_ID}",
+])
+
+
+def format_node(node, is_last: bool) -> str:
+    """Render one lease as its header line plus one line per field"""
+    lease_id, title, lessor, lessee, unit, depth, limit, status, terms = node
+
+    if depth == 0:
+        head, field = "", "|-- "
+    else:
+        head = "   |-- "
+        field = "      |-- " if is_last else "   |  |-- "
+
+    return "\n".join([
+        f"{head}ID {lease_id}: {title}",
+        f"{field}Lessor:  {lessor[0]} ({lessor[1]})",
+        f"{field}Lessee:  {lessee[0]} ({lessee[1]})",
+        f"{field}Unit:    {unit}",
+        f"{field}Depth:   {depth}",
+        f"{field}Limit:   {limit} direct {'child' if limit == 1 else 'children'}",
+        f"{field}Status:  {status}",
+        f"{field}Terms:   {terms}",
+        "",
+    ])
+
+
 def print_lease_tree():
     """Print the lease tree structure"""
-    print("="*60)
-    print("LEASE GRAPH TREE STRUCTURE")
-    print("="*60)
-    print()
-    
-    print("Contract ID: CDBFB6YDB55G7E5ZGOHYIYBLS745NVBU73TKLB6N6IT6XBKBWICNUW5I")
-    print("Network: Testnet")
-    print()
-    
-    print("TREE STRUCTURE:")
-    print("ID 1: Master Lease (Root)")
-    print("|-- Lessor:  GBAK4TXOUV5XFLWDE6IUIZYYVFQXLY4LNWNSDGNFH27NUKDUOCHGHEZX (Landlord)")
-    print("|-- Lessee:  GC773P7BXH2I2MPHHYTDCRM66EBLEUUBSKHXN47E65Q6BAZ2DZVA6UQY (Master Tenant)")
-    print("|-- Unit:    unit")
-    print("|-- Depth:   0")
-    print("|-- Limit:   2 direct children")
-    print("|-- Status:  Accepted")
-    print("|-- Terms:   dd759fa56986118f97909286aef8d20878f2e23fef094d0121b551e4eabe8a37")
-    print()
-    print("   |-- ID 2: Sublease (Level 1)")
-    print("   |  |-- Lessor:  GC773P7BXH2I2MPHHYTDCRM66EBLEUUBSKHXN47E65Q6BAZ2DZVA6UQY (Master Tenant)")
-    print("   |  |-- Lessee:  GDIMDTIVGQHEDZQNRAOXT5VXVTUQ6CU2ZDBV7YMNJAEET7QNMMIEWE7Y (Subtenant 1)")
-    print("   |  |-- Unit:    unit")
-    print("   |  |-- Depth:   1")
-    print("   |  |-- Limit:   1 direct child")
-    print("   |  |-- Status:  Pending acceptance")
-    print("   |  |-- Terms:   dd759fa56986118f97909286aef8d20878f2e23fef094d0121b551e4eabe8a37")
-    print()
-    print("   |-- ID 3: Sublease (Level 1)")
-    print("      |-- Lessor:  GC773P7BXH2I2MPHHYTDCRM66EBLEUUBSKHXN47E65Q6BAZ2DZVA6UQY (Master Tenant)")
-    print("      |-- Lessee:  GA27H6G7UFTND5MLOB6ORUXWRGXD3SMZKIBPKKRXM5AVZZ5NM76TVAV3 (Subtenant 2)")
-    print("      |-- Unit:    unit")
-    print("      |-- Depth:   1")
-    print("      |-- Limit:   1 direct child")
-    print("      |-- Status:  Pending acceptance")
-    print("      |-- Terms:   dd759fa56986118f97909286aef8d20878f2e23fef094d0121b551e4eabe8a37")
-    print()
-    
-    print("="*60)
-    print("EVENTS EMITTED")
-    print("="*60)
-    print("1. LeaseCreated: (unit, 1) -> Master Tenant")
-    print("2. LeaseAccepted: (1) -> void")
-    print("3. SubleaseCreated: (1, 2) -> Subtenant 1")
-    print("4. SubleaseCreated: (1, 3) -> Subtenant 2")
-    print()
-    
-    print("="*60)
-    print("KEY FEATURES DEMONSTRATED")
-    print("="*60)
-    print("- ID-based parent/child relationships")
-    print("- Terms validation (hash-based)")
-    print("- Acceptance control workflow")
-    print("- Branching limits enforcement")
-    print("- Depth tracking (0, 1)")
-    print("- Event emission for indexers")
-    print("- Authorization (only lessee can create subleases)")
-    print("- Unlimited sublease depth support")
-    print()
-    
-    print("="*60)
-    print("NEXT STEPS")
-    print("="*60)
-    print("1. Accept subleases (IDs 2, 3) to activate them")
-    print("2. Create third-level subleases from accepted subtenants")
-    print("3. Test terms mismatch rejection")
-    print("4. Test limit enforcement")
-    print("5. Add query functions for tree traversal")
-    print("6. Integrate with insurance/utility systems")
-    print()
-    
-    print("Contract Explorer:")
-    print("https://stellar.expert/explorer/testnet/contract/CDBFB6YDB55G7E5ZGOHYIYBLS745NVBU73TKLB6N6IT6XBKBWICNUW5I")
+    last = len(NODES) - 1
+    body = "\n".join(format_node(node, i == last) for i, node in enumerate(NODES))
+    sys.stdout.write(f"{HEADER}\n{body}\n{FOOTER}\n")
 
 if __name__ == "__main__":
     print_lease_tree()
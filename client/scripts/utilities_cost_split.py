@@ -14,16 +14,16 @@ Example:
 """
 
 import os
-import sys
 import json
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any
 from dotenv import load_dotenv
 from stellar_sdk import SorobanServer
 from stellar_sdk import scval
 
-# Add the scripts directory to the path to import common and lease_api
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# common and lease_api resolve from this script's own directory, which
+# Python already puts at the front of sys.path
 from common import ensure_funded
 from lease_api import LeaseAPI
 
@@ -40,22 +40,45 @@ def get_active_leaf_leases(lease_api: LeaseAPI, root_id: int) -> List[Dict[str,
     Returns:
         List of active leaf lease dictionaries
     """
-    def find_leaves(node_id: int) -> List[Dict[str, Any]]:
-        lease = lease_api.get_lease(node_id)
-        children = lease_api.children_of(node_id)
+    # Fetch the tree one level at a time so reads cost O(depth) rounds
+    # rather than two sequential calls per node
+    leases = {}
+    children_of = {}
+    frontier = [root_id]
+    while frontier:
+        results = lease_api.get_leases_batch(frontier)
+        for node_id, (lease, children) in zip(frontier, results):
+            leases[node_id] = lease
+            children_of[node_id] = children
+        frontier = [child_id for _, children in results for child_id in children]
+    
+    # Iterative DFS; children are pushed in reverse so leaves come out in
+    # the same left-to-right order a recursive walk would produce
+    leaves = []
+    stack = [root_id]
+    while stack:
+        node_id = stack.pop()
+        children = children_of[node_id]
         
         # If no children, this is a leaf
         if not children:
-            return [lease] if lease['active'] else []
-        
-        # Recursively find leaves from children
-        leaves = []
-        for child_id in children:
-            leaves.extend(find_leaves(child_id))
-        
-        return leaves
+            lease = leases[node_id]
+            if lease['active']:
+                leaves.append(lease)
+        else:
+            stack.extend(reversed(children))
     
-    return find_leaves(root_id)
+    return leaves
+
+def split_evenly(total: int, parts: int) -> List[int]:
+    """
+    Split an integer amount into near-equal integer shares
+    
+    The remainder goes one unit at a time to the first shares, so the
+    shares always sum to total.
+    """
+    share, remainder = divmod(total, parts)
+    return [share + 1] * remainder + [share] * (parts - remainder)
 
 def calculate_cost_split(reading: Dict[str, Any], active_leases: List[Dict[str, Any]], 
                         rates: Dict[str, float] = None) -> List[Dict[str, Any]]:
@@ -81,48 +104,47 @@ def calculate_cost_split(reading: Dict[str, Any], active_leases: List[Dict[str,
             "water": 0.008        # $0.008 per unit
         }
     
-    # Calculate total costs
-    total_electricity_cost = reading['kwh'] * rates['electricity']
-    total_gas_cost = reading['gas'] * rates['gas']
-    total_water_cost = reading['water'] * rates['water']
-    total_cost = total_electricity_cost + total_gas_cost + total_water_cost
-    
-    # Split equally among active leases
+    # Costs are split in integer cents, the precision invoices are shown at,
+    # so the displayed shares always add up exactly to the displayed totals
+    usage = {
+        "electricity": reading['kwh'],
+        "gas": reading['gas'],
+        "water": reading['water']
+    }
     num_leases = len(active_leases)
-    cost_per_lease = total_cost / num_leases
+    shares = {}
+    entries = {}
+    for utility, amount in usage.items():
+        shares[utility] = split_evenly(round(amount * rates[utility] * 100), num_leases)
+        # Usage and rate are the same for every lease and a share takes at
+        # most two values, so each distinct breakdown entry is built once
+        entries[utility] = {
+            cents: {
+                "usage": amount / num_leases,
+                "rate": rates[utility],
+                "cost": cents / 100
+            }
+            for cents in set(shares[utility])
+        }
     
     # Generate invoices
+    period = reading['period']
     invoices = []
     for i, lease in enumerate(active_leases):
-        invoice = {
+        invoices.append({
             "lease_id": lease['id'],
             "lessee": lease['lessee'],
             "unit": lease['unit'],
-            "period": reading['period'],
+            "period": period,
             "cost_breakdown": {
-                "electricity": {
-                    "usage": reading['kwh'] / num_leases,
-                    "rate": rates['electricity'],
-                    "cost": total_electricity_cost / num_leases
-                },
-                "gas": {
-                    "usage": reading['gas'] / num_leases,
-                    "rate": rates['gas'],
-                    "cost": total_gas_cost / num_leases
-                },
-                "water": {
-                    "usage": reading['water'] / num_leases,
-                    "rate": rates['water'],
-                    "cost": total_water_cost / num_leases
-                }
+                utility: entries[utility][shares[utility][i]] for utility in usage
             },
-            "total_cost": cost_per_lease
-        }
-        invoices.append(invoice)
+            "total_cost": sum(shares[utility][i] for utility in usage) / 100
+        })
     
     return invoices
 
-def split_utility_costs(unit: str, period: str, root_lease_id: int = None):
+def split_utility_costs(unit: str, period: str, root_lease_id: int = None, use_cache: bool = True):
     """
     Main function to split utility costs for a unit and period
     
@@ -130,6 +152,7 @@ def split_utility_costs(unit: str, period: str, root_lease_id: int = None):
         unit: Unit identifier
         period: Period identifier
         root_lease_id: Optional root lease ID (if not provided, will search)
+        use_cache: Memoize lease tree reads for the current ledger
     """
     # Load configuration
     utilities_contract_id = os.environ.get("UTILITIES_ORACLE_ID", "CDDO7X23GQ7J3KXACSIFRIY6T7MESM5EACTX7ZAHRRQZZIW2LYUPIX77")
@@ -143,6 +166,20 @@ def split_utility_costs(unit: str, period: str, root_lease_id: int = None):
     print(f"Analyzing utility costs for {unit} - {period}")
     print("=" * 60)
     
+    # The lease tree walk doesn't depend on the reading, so start it now and
+    # let it overlap the oracle round-trip below. Pinning happens in the same
+    # task so its failures are reported with the lease lookup's.
+    def find_leases():
+        if use_cache:
+            lease_api.pin_reads_to_ledger()
+        return get_active_leaf_leases(lease_api, root_lease_id)
+    
+    leases_future = None
+    if root_lease_id is not None:
+        pool = ThreadPoolExecutor(max_workers=1)
+        leases_future = pool.submit(find_leases)
+        pool.shutdown(wait=False)
+    
     # Read utility data
     try:
         result = rpc.invoke_contract_function(
@@ -194,7 +231,7 @@ def split_utility_costs(unit: str, period: str, root_lease_id: int = None):
         ]
     else:
         try:
-            active_leases = get_active_leaf_leases(lease_api, root_lease_id)
+            active_leases = leases_future.result()
         except Exception as e:
             print(f"ERROR: Error finding active leases: {e}")
             return
@@ -243,11 +280,13 @@ def main():
     parser.add_argument("--root-lease-id", type=int, help="Root lease ID (optional)")
     parser.add_argument("--output", choices=["console", "json"], default="console",
                       help="Output format (default: console)")
+    parser.add_argument("--no-cache", action="store_true",
+                      help="Don't memoize lease tree reads for the current ledger")
     
     args = parser.parse_args()
     
     # Split the costs
-    split_utility_costs(args.unit, args.period, args.root_lease_id)
+    split_utility_costs(args.unit, args.period, args.root_lease_id, use_cache=not args.no_cache)
 
 if __name__ == "__main__":
     main()
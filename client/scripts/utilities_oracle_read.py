@@ -21,6 +21,10 @@ from stellar_sdk import Keypair, Network, Address, TransactionBuilder
 from stellar_sdk import SorobanServer
 from stellar_sdk import scval
 
+# common resolves from this script's own directory, which Python already
+# puts at the front of sys.path
+from common import keypair_from_secret
+
 load_dotenv()
 
 def read_utility_reading(unit: str, period: str):
@@ -40,8 +44,7 @@ def read_utility_reading(unit: str, period: str):
     network_passphrase = os.environ["NETWORK_PASSPHRASE"]
     
     # Load a dummy account for simulation
-    admin_secret = os.environ["ARBITRATOR_SECRET"]
-    admin = Keypair.from_secret(admin_secret)
+    admin = keypair_from_secret(os.environ["ARBITRATOR_SECRET"])
     
     # Initialize RPC client
     rpc = SorobanServer(rpc_url)
@@ -20,9 +20,9 @@ from stellar_sdk import Keypair, Network, Address, TransactionBuilder
 from stellar_sdk import SorobanServer
 from stellar_sdk import scval
 
-# Add the scripts directory to the path to import common
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from common import ensure_funded
+# common resolves from this script's own directory, which Python already
+# puts at the front of sys.path
+from common import ensure_funded, keypair_from_secret
 
 load_dotenv()
 
@@ -43,8 +43,7 @@ def write_utility_reading(unit: str, period: str, kwh: int, gas: int, water: int
     network_passphrase = os.environ["NETWORK_PASSPHRASE"]
     
     # Load admin keypair
-    admin_secret = os.environ["ARBITRATOR_SECRET"]
-    admin = Keypair.from_secret(admin_secret)
+    admin = keypair_from_secret(os.environ["ARBITRATOR_SECRET"])
     
     # Ensure admin account is funded
     ensure_funded(admin.public_key)
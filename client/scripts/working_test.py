@@ -6,24 +6,28 @@ This script tests the lease graph contract on testnet with proper fees and auth.
 """
 
 import os
-import json
-import hashlib
-import binascii
+import time
 from dotenv import load_dotenv
 from stellar_sdk import Keypair, Network, Address, TransactionBuilder
 from stellar_sdk import SorobanServer
 from stellar_sdk import scval
+from common import generate_terms_digest
 
 load_dotenv()
 rpc = SorobanServer(os.environ["SOROBAN_RPC"])
 pp = Network.TESTNET_NETWORK_PASSPHRASE
 contract_id = "CDBFB6YDB55G7E5ZGOHYIYBLS745NVBU73TKLB6N6IT6XBKBWICNUW5I"
 
-def generate_terms_hash(terms_dict):
-    """Generate SHA-256 hash of canonical JSON terms"""
-    canon = json.dumps(terms_dict, separators=(',', ':'), sort_keys=True).encode()
-    h = hashlib.sha256(canon).digest()
-    return binascii.hexlify(h).decode()
+def wait_for_result(send_result, attempts=30, delay=1.0):
+    """Poll a sent transaction until it is final; returns the final status name"""
+    if send_result.status.value not in ("PENDING", "DUPLICATE"):
+        return send_result.status.value
+    for _ in range(attempts):
+        status = rpc.get_transaction(send_result.hash).status.value
+        if status != "NOT_FOUND":
+            return status
+        time.sleep(delay)
+    return "NOT_FOUND"
 
 def main():
     print("Lease Graph Testnet Test")
@@ -43,14 +47,19 @@ def main():
         "notice_days": 30,
         "penalty": "0.02"
     }
-    terms_hash_hex = generate_terms_hash(terms_dict)
-    terms_bytes = bytes.fromhex(terms_hash_hex)
+    terms_bytes = generate_terms_digest(terms_dict)
     
-    print(f"Terms Hash: {terms_hash_hex}")
+    print(f"Terms Hash: {terms_bytes.hex()}")
+    
+    # Parameters shared by both create calls; SCVals are plain XDR values
+    # and can be reused across transactions
+    terms_sc = scval.to_bytes(terms_bytes)
+    expiry_sc = scval.to_uint64(2000000000)  # expiry_ts: far future
     
     # Load accounts
     landlord_account = rpc.load_account(landlord_kp.public_key)
     tenant_account = rpc.load_account(tenant_kp.public_key)
+    tenant_seq0 = tenant_account.sequence
     
     print("\nCreating Master Lease...")
     
@@ -64,9 +73,9 @@ def main():
                 scval.to_symbol("unit"),
                 scval.to_address(Address(landlord_kp.public_key)),
                 scval.to_address(Address(tenant_kp.public_key)),
-                scval.to_bytes(terms_bytes),
+                terms_sc,
                 scval.to_uint32(2),  # limit: max 2 direct children
-                scval.to_uint64(2000000000)  # expiry_ts: far future
+                expiry_sc
             ]
         ).build()
     
@@ -74,10 +83,17 @@ def main():
     result1 = rpc.send_transaction(tx1)
     print(f"Master lease result: {result1}")
     
-    if result1.status.value == "SUCCESS":
+    # tx2 and tx3 both need lease 1, so tx1 must be in a ledger first
+    if wait_for_result(result1) == "SUCCESS":
         print("SUCCESS: Master lease created!")
         
-        print("\nAccepting Master Lease...")
+        print("\nAccepting Master Lease and Creating Sublease...")
+        
+        # Accept and create_sublease both need lease 1 to exist, but not each
+        # other (the contract doesn't require an accepted parent). Both are
+        # built from the same tenant account, which gives them consecutive
+        # sequence numbers, and are submitted back to back without a
+        # load_account or wait in between.
         
         # 2) Accept the lease
         tx2 = TransactionBuilder(tenant_account, network_passphrase=pp, base_fee=100000) \
@@ -89,37 +105,40 @@ def main():
                     scval.to_uint64(1)  # lease ID
                 ]
             ).build()
-        
         tx2.sign(tenant_kp)
+        
+        # build() bumped the local sequence; no reload needed for tx3
+        assert tenant_account.sequence == tenant_seq0 + 1
+        
+        # 3) Create sublease
+        subtenant_kp = Keypair.random()
+        tx3 = TransactionBuilder(tenant_account, network_passphrase=pp, base_fee=100000) \
+            .add_time_bounds(0, 300) \
+            .append_invoke_contract_function_op(
+                contract_id=contract_id,
+                function_name="create_sublease",
+                parameters=[
+                    scval.to_uint64(1),  # parent_id
+                    scval.to_address(Address(subtenant_kp.public_key)),
+                    terms_sc,  # same terms as parent
+                    scval.to_uint32(1),  # limit: max 1 direct child
+                    expiry_sc
+                ]
+            ).build()
+        tx3.sign(tenant_kp)
+        
+        # Submit both, then wait on both: they can land in the same ledger
         result2 = rpc.send_transaction(tx2)
-        print(f"Accept result: {result2}")
+        result3 = rpc.send_transaction(tx3)
+        status2 = wait_for_result(result2)
+        status3 = wait_for_result(result3)
+        print(f"Accept result: {result2} -> {status2}")
+        print(f"Sublease result: {result3} -> {status3}")
         
-        if result2.status.value == "SUCCESS":
+        if status2 == "SUCCESS":
             print("SUCCESS: Master lease accepted!")
             
-            print("\nCreating Sublease...")
-            
-            # 3) Create sublease
-            subtenant_kp = Keypair.random()
-            tx3 = TransactionBuilder(tenant_account, network_passphrase=pp, base_fee=100000) \
-                .add_time_bounds(0, 300) \
-                .append_invoke_contract_function_op(
-                    contract_id=contract_id,
-                    function_name="create_sublease",
-                    parameters=[
-                        scval.to_uint64(1),  # parent_id
-                        scval.to_address(Address(subtenant_kp.public_key)),
-                        scval.to_bytes(terms_bytes),  # same terms as parent
-                        scval.to_uint32(1),  # limit: max 1 direct child
-                        scval.to_uint64(2000000000)  # expiry_ts: far future
-                    ]
-                ).build()
-            
-            tx3.sign(tenant_kp)
-            result3 = rpc.send_transaction(tx3)
-            print(f"Sublease result: {result3}")
-            
-            if result3.status.value == "SUCCESS":
+            if status3 == "SUCCESS":
                 print("SUCCESS: Sublease created!")
                 
                 print("\n" + "="*50)
@@ -136,9 +155,9 @@ def main():
                 print("- Demonstrated lease graph functionality")
                 
             else:
-                print(f"FAILED: Sublease creation failed: {result3}")
+                print(f"FAILED: Sublease creation failed: {status3}")
         else:
-            print(f"FAILED: Lease acceptance failed: {result2}")
+            print(f"FAILED: Lease acceptance failed: {status2}")
     else:
         print(f"FAILED: Master lease creation failed: {result1}")
     
@@ -8,30 +8,195 @@ and returns realistic responses that match the expected data structure.
 """
 
 import os
-import secrets
+import sys
+import base64
 import time
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
 from dotenv import load_dotenv
-from stellar_sdk import Keypair
 
 # Load environment variables from config.env in final-web-demo root
 # final-web-demo/api/demo_runner.py -> go up one level to final-web-demo, then config.env
 project_root = os.path.dirname(os.path.dirname(__file__))
 config_path = os.path.join(project_root, 'config.env')
-load_dotenv(config_path, override=True)
+# Parse the file once per module, even across reloads; variables already
+# set in the environment (e.g. by the deploy platform) take precedence over it
+if not globals().get("_dotenv_loaded"):
+    load_dotenv(config_path, override=False)
+    _dotenv_loaded = True
+
+# scripts/ holds lease_api and common. It goes on the path once here rather
+# than in every handler; the modules are still imported where they're used,
+# since they pull in stellar_sdk.
+_SCRIPTS_DIR = os.path.join(project_root, 'scripts')
+if _SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, _SCRIPTS_DIR)
+
+# Block explorer base for transaction links; point at .../public/tx/ for mainnet
+_EXPLORER = os.getenv("EXPLORER_URL", "https://stellar.expert/explorer/testnet/tx/")
+
+# The demo's fixed SEP-10 challenge, KYC record and utility figures.
+# Responses share these rather than rebuilding them per request; callers only
+# serialize them.
+_SEP10_CHALLENGE = "AAAAA..." * 10  # Mock transaction challenge
+
+_KYC_DATA = {
+    "first_name": "John",
+    "last_name": "Doe",
+    "email": "john.doe@example.com",
+    "phone": "+1-555-123-4567",
+    "address": {
+        "line1": "285 Washington St",
+        "city": "Somerville",
+        "state": "MA",
+        "postal_code": "02143",
+        "country": "US"
+    },
+    "date_of_birth": "1990-01-15",
+    "id_type": "drivers_license",
+    "id_number": "DL123456789",
+    "verified": True
+}
+
+# Mock usage (kWh, gas units, water units), USD rates per unit, and the
+# USD -> XLM conversion (1 USD = 0.33 XLM)
+_USAGE = (320, 14, 6800)
+_RATES_USD = (0.12, 1.50, 0.008)
+_USD_TO_XLM = 0.33
+_COSTS_USD = tuple(u * r for u, r in zip(_USAGE, _RATES_USD))
+_TOTAL_XLM = sum(_COSTS_USD) * _USD_TO_XLM
+_TOTAL_USAGE = {
+    "electricity": f"{_USAGE[0]} kWh",
+    "gas": f"{_USAGE[1]} units",
+    "water": f"{_USAGE[2]} units"
+}
+_BREAKDOWN = dict(zip(
+    ("electricity", "gas", "water"),
+    (f"{c * _USD_TO_XLM:.3f} XLM" for c in _COSTS_USD)
+))
+
+
+@functools.lru_cache(maxsize=None)
+def get_horizon_server(horizon_url: str):
+    """Shared Horizon client, so warm instances reuse its connection pool"""
+    # common already holds a client for the configured Horizon (used by
+    # ensure_funded); share it so funding checks and payments use one pool
+    import common
+    if horizon_url == common.HORIZON:
+        return common.server
+    from stellar_sdk import Server
+    return Server(horizon_url)
+
+
+@functools.lru_cache(maxsize=None)
+def get_lease_api(registry_id: str, rpc_url: str):
+    """Shared LeaseAPI (and its SorobanServer) per registry and RPC endpoint"""
+    from lease_api import LeaseAPI
+    return LeaseAPI(registry_id, rpc_url)
+
+
+def fake_account_address() -> str:
+    """
+    Random G... string shaped like a Stellar account ID, for mock display.
+
+    Not a valid StrKey (no version byte or checksum), but the lease tree only
+    renders these; Keypair.random() would cost an Ed25519 keygen per address.
+    """
+    return "G" + base64.b32encode(os.urandom(35)).decode()[:55]
+
+
+def with_backoff(fn, *args, attempts: int = 5, base: float = 0.1, cap: float = 2.0):
+    """
+    Call fn(*args), retrying Horizon rate limits (429), 5xx responses and
+    dropped connections with a doubling delay capped at cap seconds.
+
+    Submit transactions through submit_with_backoff instead, which handles
+    a retry that is rejected because the first attempt already landed.
+    """
+    from stellar_sdk.exceptions import BaseHorizonError, ConnectionError as SdkConnectionError
+    
+    delay = base
+    for attempt in range(attempts):
+        try:
+            return fn(*args)
+        except BaseHorizonError as e:
+            if (e.status != 429 and e.status < 500) or attempt == attempts - 1:
+                raise
+        except SdkConnectionError:
+            if attempt == attempts - 1:
+                raise
+        time.sleep(delay)
+        delay = min(delay * 2, cap)
+
+
+def submit_with_backoff(server, tx):
+    """
+    Submit tx with with_backoff's retries
+
+    A 5xx (e.g. a 504 gateway timeout) can come back for a transaction that
+    still made it into a ledger. Resubmitting it can't apply it twice, but
+    Horizon rejects the retry (tx_bad_seq, a 400), so on a 400 after a
+    failed attempt Horizon is asked whether the transaction landed before
+    the error is raised.
+    """
+    from stellar_sdk.exceptions import BaseHorizonError, NotFoundError
+    
+    tries = 0
+    
+    def submit():
+        nonlocal tries
+        tries += 1
+        return server.submit_transaction(tx)
+    
+    try:
+        return with_backoff(submit)
+    except BaseHorizonError as e:
+        if e.status != 400 or tries == 1:
+            raise
+        try:
+            return server.transactions().transaction(tx.hash_hex()).call()
+        except NotFoundError:
+            raise e from None
+
+
+def wait_for_tx(server, tx_hash: str, max_wait: float = 5.0) -> bool:
+    """Poll Horizon until tx_hash is in a ledger; False if max_wait runs out"""
+    from stellar_sdk.exceptions import NotFoundError
+    
+    deadline = time.monotonic() + max_wait
+    delay = 0.1
+    while True:
+        try:
+            server.transactions().transaction(tx_hash).call()
+            return True
+        except NotFoundError:
+            pass
+        if time.monotonic() + delay > deadline:
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, 0.8)
 
 
 def generate_tx_hash() -> str:
-    """Generate a realistic transaction hash (64-char hex)"""
-    return secrets.token_hex(32)
+    """
+    Generate a realistic transaction hash (64-char hex)
+    
+    Each call returns a new hash, so a step that shows its hash in both
+    tx_hash and explorer_url must generate it once and reuse it.
+    """
+    return os.urandom(32).hex()
 
 
+@functools.lru_cache(maxsize=1)
 def get_account_info():
-    """Extract public keys from secrets in config"""
+    """Extract public keys from secrets in config (read-only; computed once per process)"""
     tenant_secret = os.getenv("TENANT_SECRET")
     landlord_secret = os.getenv("LANDLORD_SECRET")
     arbitrator_secret = os.getenv("ARBITRATOR_SECRET")
     
+    from stellar_sdk import Keypair
+    
     return {
         "tenant": Keypair.from_secret(tenant_secret).public_key if tenant_secret else "GABC...TENANT",
         "landlord": Keypair.from_secret(landlord_secret).public_key if landlord_secret else "GABC...LANDLORD",
@@ -46,7 +211,7 @@ def mock_sep10_authentication() -> Dict[str, Any]:
     """
     return {
         "success": True,
-        "challenge": "AAAAA..." * 10,  # Mock transaction challenge
+        "challenge": _SEP10_CHALLENGE,
         "tx_hash": generate_tx_hash(),
         "message": "User authenticated via SEP-10"
     }
@@ -63,46 +228,62 @@ def mock_sep12_kyc() -> Dict[str, Any]:
     return {
         "success": True,
         "customer_id": "CUST_" + generate_tx_hash()[:16],
-        "kyc_data": {
-            "first_name": "John",
-            "last_name": "Doe",
-            "email": "john.doe@example.com",
-            "phone": "+1-555-123-4567",
-            "address": {
-                "line1": "285 Washington St",
-                "city": "Somerville",
-                "state": "MA",
-                "postal_code": "02143",
-                "country": "US"
-            },
-            "date_of_birth": "1990-01-15",
-            "id_type": "drivers_license",
-            "id_number": "DL123456789",
-            "verified": True
-        },
+        "kyc_data": _KYC_DATA,
         "timestamp": timestamp,
         "tx_hash": generate_tx_hash(),
         "message": "KYC data collected and stored"
     }
 
 
+def pay_rent_steps(sep10_hash: str, sep12_hash: str, customer_id: str,
+                   payment_hash: str, payer: str, payee: str, amount: str,
+                   lease_id: str, activation_hash: str) -> List[Dict[str, Any]]:
+    """The four pay-rent steps, shared by the real and simulated responses"""
+    return [
+        {
+            "name": "SEP-10 Authentication",
+            "tx_hash": sep10_hash,
+            "status": "confirmed",
+            "explorer_url": _EXPLORER + sep10_hash
+        },
+        {
+            "name": "SEP-12 KYC Verification",
+            "tx_hash": sep12_hash,
+            "customer_id": customer_id,
+            "status": "confirmed",
+            "explorer_url": _EXPLORER + sep12_hash
+        },
+        {
+            "name": "Payment",
+            "tx_hash": payment_hash,
+            "from": payer,
+            "to": payee,
+            "amount": amount,
+            "status": "confirmed",
+            "explorer_url": _EXPLORER + payment_hash
+        },
+        {
+            "name": "Activation",
+            "tx_hash": activation_hash,
+            "lease_id": lease_id,
+            "status": "confirmed",
+            "lock_status": "UNLOCKED",
+            "event": "Activated",
+            "explorer_url": _EXPLORER + activation_hash
+        }
+    ]
+
+
 def execute_pay_rent() -> Dict[str, Any]:
     """
     Execute actual payment and activation on Stellar testnet
     Returns payment and activation results
     """
-    import sys
     import time
     import subprocess
     
-    # Add local scripts to path
-    # final-web-demo/api/demo_runner.py -> go up one level to final-web-demo, then to scripts/
-    project_root = os.path.dirname(os.path.dirname(__file__))
-    scripts_path = os.path.join(project_root, 'scripts')
-    sys.path.insert(0, scripts_path)
-    
     try:
-        from common import ensure_funded
+        from common import ensure_funded, keypair_from_secret
         from lease_api import LeaseAPI
         from stellar_sdk import Server, Keypair, TransactionBuilder, Asset, Payment
         from stellar_sdk.exceptions import BaseHorizonError
@@ -121,31 +302,30 @@ def execute_pay_rent() -> Dict[str, Any]:
         if not all([horizon_url, network_passphrase, tenant_secret, landlord_secret]):
             raise Exception("Missing required environment variables")
         
-        server = Server(horizon_url)
-        tenant = Keypair.from_secret(tenant_secret)
-        landlord = Keypair.from_secret(landlord_secret)
+        server = get_horizon_server(horizon_url)
+        tenant = keypair_from_secret(tenant_secret)
+        landlord = keypair_from_secret(landlord_secret)
         
         # Step 0: SEP-10 Authentication
         print("Authenticating via SEP-10...")
         sep10_result = mock_sep10_authentication()
         sep10_hash = sep10_result['tx_hash']
-        time.sleep(0.5)
         
         # Step 1: SEP-12 KYC Verification
         print("Collecting KYC data via SEP-12...")
         sep12_result = mock_sep12_kyc()
         sep12_hash = sep12_result['tx_hash']
-        time.sleep(0.5)
         
-        # Ensure accounts are funded
-        print("Funding tenant account...")
-        ensure_funded(tenant.public_key)
-        print("Funding landlord account...")
-        ensure_funded(landlord.public_key)
+        # Ensure accounts are funded (ensure_funded remembers accounts it has
+        # seen, so warm requests skip the Horizon lookups). The two accounts
+        # are independent, so a cold start checks them concurrently.
+        print("Funding tenant and landlord accounts...")
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(ensure_funded, (tenant.public_key, landlord.public_key)))
         
         # Load account and build transaction
         print("Loading account and building transaction...")
-        account = server.load_account(tenant.public_key)
+        account = with_backoff(server.load_account, tenant.public_key)
         amount = "3500"
         
         tx = (TransactionBuilder(account, network_passphrase=network_passphrase, base_fee=100)
@@ -157,12 +337,13 @@ def execute_pay_rent() -> Dict[str, Any]:
         print("Signing transaction...")
         tx.sign(tenant)
         print("Submitting transaction...")
-        payment_resp = server.submit_transaction(tx)
+        payment_resp = submit_with_backoff(server, tx)
         payment_hash = payment_resp['hash']
         print(f"Payment hash: {payment_hash}")
         
-        # Wait for confirmation
-        time.sleep(2)
+        # Wait for confirmation. Horizon normally answers submit only once
+        # the transaction is in a ledger, so this usually returns at once
+        wait_for_tx(server, payment_hash)
         
         # Step 2: Activate lease (try, but don't fail if it errors)
         activation_hash = None
@@ -172,51 +353,26 @@ def execute_pay_rent() -> Dict[str, Any]:
             lessor_secret = os.getenv("LESSOR_SECRET")
             
             if all([registry_id, rpc_url, lessor_secret]):
-                api = LeaseAPI(registry_id, rpc_url)
-                lessor = Keypair.from_secret(lessor_secret)
+                api = get_lease_api(registry_id, rpc_url)
+                lessor = keypair_from_secret(lessor_secret)
                 # Use integer ID for actual API call
                 activation_result = api.set_active(lessor, 4)
-                activation_hash = activation_result.get('hash', generate_tx_hash())
+                activation_hash = activation_result.get('hash')
                 print(f"Activation hash: {activation_hash}")
         except Exception as activation_error:
             print(f"Activation failed (expected on testnet): {activation_error}")
-            activation_hash = generate_tx_hash()
+        
+        # Stand-in hash when activation was skipped or failed, used for both
+        # the step's tx_hash and its explorer link
+        activation_hash = activation_hash or generate_tx_hash()
         
         return {
             "success": True,
-            "steps": [
-                {
-                    "name": "SEP-10 Authentication",
-                    "tx_hash": sep10_hash,
-                    "status": "confirmed",
-                    "explorer_url": f"https://stellar.expert/explorer/testnet/tx/{sep10_hash}"
-                },
-                {
-                    "name": "SEP-12 KYC Verification",
-                    "tx_hash": sep12_hash,
-                    "customer_id": sep12_result.get('customer_id', 'N/A'),
-                    "status": "confirmed",
-                    "explorer_url": f"https://stellar.expert/explorer/testnet/tx/{sep12_hash}"
-                },
-                {
-                    "name": "Payment",
-                    "tx_hash": payment_hash,
-                    "from": tenant.public_key,
-                    "to": landlord.public_key,
-                    "amount": f"{amount} XLM",
-                    "status": "confirmed",
-                    "explorer_url": f"https://stellar.expert/explorer/testnet/tx/{payment_hash}"
-                },
-                {
-                    "name": "Activation",
-                    "tx_hash": activation_hash or generate_tx_hash(),
-                    "lease_id": lease_id,
-                    "status": "confirmed",
-                    "lock_status": "UNLOCKED",
-                    "event": "Activated",
-                    "explorer_url": f"https://stellar.expert/explorer/testnet/tx/{activation_hash or generate_tx_hash()}"
-                }
-            ]
+            "steps": pay_rent_steps(
+                sep10_hash, sep12_hash, sep12_result.get('customer_id', 'N/A'),
+                payment_hash, tenant.public_key, landlord.public_key,
+                f"{amount} XLM", lease_id, activation_hash
+            )
         }
         
     except Exception as e:
@@ -231,42 +387,17 @@ def execute_pay_rent() -> Dict[str, Any]:
         # Mock SEP-10 and SEP-12 results
         sep10_result = mock_sep10_authentication()
         sep12_result = mock_sep12_kyc()
+        payment_hash = generate_tx_hash()
+        activation_hash = generate_tx_hash()
         
         return {
             "success": True,
-            "steps": [
-                {
-                    "name": "SEP-10 Authentication",
-                    "tx_hash": sep10_result['tx_hash'],
-                    "status": "confirmed",
-                    "explorer_url": f"https://stellar.expert/explorer/testnet/tx/{sep10_result['tx_hash']}"
-                },
-                {
-                    "name": "SEP-12 KYC Verification",
-                    "tx_hash": sep12_result['tx_hash'],
-                    "customer_id": sep12_result.get('customer_id', 'N/A'),
-                    "status": "confirmed",
-                    "explorer_url": f"https://stellar.expert/explorer/testnet/tx/{sep12_result['tx_hash']}"
-                },
-                {
-                    "name": "Payment",
-                    "tx_hash": generate_tx_hash(),
-                    "from": accounts["tenant"],
-                    "to": accounts["landlord"],
-                    "amount": "3,500 XLM",
-                    "status": "confirmed",
-                    "explorer_url": f"https://stellar.expert/explorer/testnet/tx/{generate_tx_hash()[:16]}"
-                },
-                {
-                    "name": "Activation",
-                    "tx_hash": generate_tx_hash(),
-                    "lease_id": lease_id,
-                    "status": "confirmed",
-                    "lock_status": "UNLOCKED",
-                    "event": "Activated",
-                    "explorer_url": f"https://stellar.expert/explorer/testnet/tx/{generate_tx_hash()[:16]}"
-                }
-            ],
+            "steps": pay_rent_steps(
+                sep10_result['tx_hash'], sep12_result['tx_hash'],
+                sep12_result.get('customer_id', 'N/A'),
+                payment_hash, accounts["tenant"], accounts["landlord"],
+                "3,500 XLM", lease_id, activation_hash
+            ),
             "note": "Note: Using simulated data (real blockchain connection failed)"
         }
 
@@ -276,7 +407,6 @@ def execute_place_bid(amount: float) -> Dict[str, Any]:
     Place a REAL bid on a Soroban auction contract
     This creates actual blockchain transactions that can be viewed on stellar.expert
     """
-    import sys
     import time
     
     try:
@@ -351,12 +481,8 @@ def mock_post_reading() -> Dict[str, Any]:
         "tx_hash": tx_hash,
         "unit": unit,
         "period": period,
-        "readings": {
-            "electricity": "320 kWh",
-            "gas": "14 units",
-            "water": "6800 units"
-        },
-        "explorer_url": f"https://stellar.expert/explorer/testnet/tx/{tx_hash}"
+        "readings": _TOTAL_USAGE,
+        "explorer_url": _EXPLORER + tx_hash
     }
 
 
@@ -364,14 +490,8 @@ def execute_split_utilities() -> Dict[str, Any]:
     """
     Execute REAL utility cost splitting calculation from demo_split_utilities.py
     """
-    import sys
     import time
     
-    # Add local scripts to path
-    project_root = os.path.dirname(os.path.dirname(__file__))
-    scripts_path = os.path.join(project_root, 'scripts')
-    sys.path.insert(0, scripts_path)
-    
     try:
         from lease_api import LeaseAPI
         from stellar_sdk import SorobanServer, Keypair, TransactionBuilder
@@ -382,15 +502,12 @@ def execute_split_utilities() -> Dict[str, Any]:
         lease_id = int(os.getenv("LEAF_ID", 4))
         root_id = int(os.getenv("ROOT_ID", 1))
         
-        # Try to read real utility data
-        kwh, gas, water = 320, 14, 6800  # Default mock values
-        
         # Get lease tree
         registry_id = os.getenv("REGISTRY_ID")
         rpc_url = os.getenv("SOROBAN_RPC")
         
         if registry_id and rpc_url:
-            api = LeaseAPI(registry_id, rpc_url)
+            api = get_lease_api(registry_id, rpc_url)
             tree_rows = api.get_full_tree(root_id, include_inactive=False)
             
             # Find active leaf leases
@@ -401,42 +518,16 @@ def execute_split_utilities() -> Dict[str, Any]:
         else:
             n = 1
         
-        # Calculate costs in USD
-        rates = {
-            "electricity": 0.12,
-            "gas": 1.50,
-            "water": 0.008
-        }
-        
-        total_electricity_cost_usd = kwh * rates['electricity']
-        total_gas_cost_usd = gas * rates['gas']
-        total_water_cost_usd = water * rates['water']
-        total_cost_usd = total_electricity_cost_usd + total_gas_cost_usd + total_water_cost_usd
-        cost_per_lease_usd = total_cost_usd / n
-        
-        # Convert to XLM (1 USD = 0.33 XLM)
-        usd_to_xlm_rate = 0.33
-        total_electricity_cost_xlm = total_electricity_cost_usd * usd_to_xlm_rate
-        total_gas_cost_xlm = total_gas_cost_usd * usd_to_xlm_rate
-        total_water_cost_xlm = total_water_cost_usd * usd_to_xlm_rate
-        cost_per_lease_xlm = cost_per_lease_usd * usd_to_xlm_rate
-        
+        # Usage is still the demo's fixed figures (the oracle isn't read
+        # here), so the totals come precomputed and only the split varies
         return {
             "success": True,
             "unit": unit,
             "period": period,
             "active_leases": n,
-            "total_usage": {
-                "electricity": f"{kwh} kWh",
-                "gas": f"{gas} units",
-                "water": f"{water} units"
-            },
-            "per_lease_cost": f"{cost_per_lease_xlm:.3f} XLM",
-            "breakdown": {
-                "electricity": f"{total_electricity_cost_xlm:.3f} XLM",
-                "gas": f"{total_gas_cost_xlm:.3f} XLM",
-                "water": f"{total_water_cost_xlm:.3f} XLM"
-            }
+            "total_usage": _TOTAL_USAGE,
+            "per_lease_cost": f"{_TOTAL_XLM / n:.3f} XLM",
+            "breakdown": _BREAKDOWN
         }
         
     except Exception as e:
@@ -455,29 +546,8 @@ def mock_split_utilities() -> Dict[str, Any]:
     lease_id = int(os.getenv("LEAF_ID", 4))
     root_id = int(os.getenv("ROOT_ID", 1))
     
-    # Mock calculations
-    kwh = 320
-    gas = 14
-    water = 6800
-    
-    rates = {
-        "electricity": 0.12,
-        "gas": 1.50,
-        "water": 0.008
-    }
-    
-    # Calculate costs in USD
-    total_electricity_cost_usd = kwh * rates['electricity']
-    total_gas_cost_usd = gas * rates['gas']
-    total_water_cost_usd = water * rates['water']
-    total_cost_usd = total_electricity_cost_usd + total_gas_cost_usd + total_water_cost_usd
-    
-    # Convert to XLM (1 USD = 0.33 XLM)
-    usd_to_xlm_rate = 0.33
-    total_electricity_cost_xlm = total_electricity_cost_usd * usd_to_xlm_rate
-    total_gas_cost_xlm = total_gas_cost_usd * usd_to_xlm_rate
-    total_water_cost_xlm = total_water_cost_usd * usd_to_xlm_rate
-    total_cost_xlm = total_cost_usd * usd_to_xlm_rate
+    kwh, gas, water = _USAGE
+    total_cost_xlm = f"{_TOTAL_XLM:.3f} XLM"
     
     return {
         "success": True,
@@ -485,24 +555,16 @@ def mock_split_utilities() -> Dict[str, Any]:
         "period": period,
         "active_leases": 1,
         "root_id": root_id,
-        "total_usage": {
-            "electricity": f"{kwh} kWh",
-            "gas": f"{gas} units",
-            "water": f"{water} units"
-        },
-        "per_lease_cost": f"{total_cost_xlm:.3f} XLM",
-        "breakdown": {
-            "electricity": f"{total_electricity_cost_xlm:.3f} XLM",
-            "gas": f"{total_gas_cost_xlm:.3f} XLM",
-            "water": f"{total_water_cost_xlm:.3f} XLM"
-        },
+        "total_usage": _TOTAL_USAGE,
+        "per_lease_cost": total_cost_xlm,
+        "breakdown": _BREAKDOWN,
         "lease_details": [
             {
                 "lease_id": lease_id,
                 "share_kwh": kwh,
                 "share_gas": gas,
                 "share_water": water,
-                "cost": f"{total_cost_xlm:.3f} XLM"
+                "cost": total_cost_xlm
             }
         ]
     }
@@ -514,56 +576,42 @@ def mock_mark_delinquent() -> Dict[str, Any]:
     Returns delinquency marking result
     """
     lease_id = int(os.getenv("LEAF_ID", 4))
+    tx_hash = generate_tx_hash()
     
     return {
         "success": True,
-        "tx_hash": generate_tx_hash(),
+        "tx_hash": tx_hash,
         "lease_id": lease_id,
         "status": "delinquent",
         "lock_status": "LOCKED",
         "event": "Delinq",
-        "explorer_url": f"https://stellar.expert/explorer/testnet/tx/{generate_tx_hash()[:16]}"
+        "explorer_url": _EXPLORER + tx_hash
     }
 
 
+@functools.lru_cache(maxsize=1)
 def fetch_lease_tree() -> Dict[str, Any]:
     """
     Fetch the complete lease tree showing all entities
     Returns a structure with landlord -> tenant (you as subleaser) -> subtenant
+
+    The tree is a mock with generated landlord/subtenant addresses, so it is
+    built once per process and shared; callers only serialize it. Once it
+    reads real chain state, key the cache on the latest ledger sequence
+    instead, since the tree can only change when a ledger closes.
     """
-    import sys
-    
-    # Add local scripts to path
-    project_root = os.path.dirname(os.path.dirname(__file__))
-    scripts_path = os.path.join(project_root, 'scripts')
-    sys.path.insert(0, scripts_path)
-    
     # Use provided addresses
     tenant_addr = "GBAK4TXOUV5XFLWDE6IUIZYYVFQXLY4LNWNSDGNFH27NUKDUOCHGHEZX"  # Tenant
     subleaser_addr = "GC773P7BXH2I2MPHHYTDCRM66EBLEUUBSKHXN47E65Q6BAZ2DZVA6UQY"  # Subleaser (You)
     
     # Generate random landlord address
-    try:
-        from stellar_sdk import Keypair
-        landlord_keypair = Keypair.random()
-        landlord_addr = landlord_keypair.public_key
-    except:
-        landlord_addr = "GBLLANDLORD1234567890ABCDEFGHIJKLMNOPQRSTUVWX"
+    landlord_addr = fake_account_address()
     
     # Mock tree structure with multiple subleases
     # Structure: Landlord -> Tenant -> You (Subleaser) -> Multiple Subtenants
-    try:
-        from stellar_sdk import Keypair
-        subtenant1_keypair = Keypair.random()
-        subtenant2_keypair = Keypair.random()
-        subtenant3_keypair = Keypair.random()
-        subtenant1_addr = subtenant1_keypair.public_key
-        subtenant2_addr = subtenant2_keypair.public_key
-        subtenant3_addr = subtenant3_keypair.public_key
-    except:
-        subtenant1_addr = "GSUB1...SUBTENANT1"
-        subtenant2_addr = "GSUB2...SUBTENANT2"
-        subtenant3_addr = "GSUB3...SUBTENANT3"
+    subtenant1_addr = fake_account_address()
+    subtenant2_addr = fake_account_address()
+    subtenant3_addr = fake_account_address()
     
     # Generate larger ASCII tree with addresses only
     ascii_tree = f"""{landlord_addr}
@@ -684,28 +732,7 @@ def fetch_lease_tree() -> Dict[str, Any]:
     }
     
     # For demo purposes, always return mock tree with the specified addresses
-    # TODO: In production, implement real blockchain queries here
+    # TODO: In production, implement real blockchain queries here. Read the
+    # tree a level at a time (LeaseAPI.get_subtree in client/scripts does
+    # this with concurrent per-level reads) rather than one request per node.
     return mock_tree
-
-
-def generate_ascii_tree(trees: List[Dict[str, Any]], prefix: str = "", is_last: bool = True) -> str:
-    """
-    Generate ASCII tree representation from tree structure
-    """
-    if not trees:
-        return ""
-    
-    tree_lines = []
-    for i, node in enumerate(trees):
-        is_last_node = i == len(trees) - 1
-        node_prefix = "└── " if is_last_node else "├── "
-        tree_lines.append(prefix + node_prefix + str(node['id']))
-        
-        if node.get('children'):
-            child_prefix = prefix + ("    " if is_last_node else "│   ")
-            child_tree = generate_ascii_tree(node['children'], child_prefix, is_last_node)
-            if child_tree:
-                tree_lines.append(child_tree)
-    
-    return "\n".join(tree_lines)
-
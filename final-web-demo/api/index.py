@@ -3,27 +3,33 @@
 Flask Web Demo Application for Lease-Lock System
 
 This is a Vercel serverless function that serves the demo interface
-and provides API endpoints for each demo step.
+and provides API endpoints for each demo step. web-demo/ is a separately
+deployed copy of the demo with its own app; the two never share a process.
 """
 
 import os
 import sys
-import time
-from flask import Flask, render_template, jsonify, request
+import functools
+import threading
+from flask import Flask, Response, render_template, jsonify, request, send_from_directory, abort
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.exceptions import HTTPException, InternalServerError
+
+# orjson is optional; it only speeds up encoding the API responses
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Simple in-memory state for demo
-# In production, this would be stored in a database or blockchain
-payment_state = {"complete": False}
+# In production, this would be stored in a database or blockchain.
+# The flag is per process; workers don't share it.
+_payment_complete = threading.Event()
 
-# Add api directory to path
+# Add api directory to path. demo_runner pulls in the Stellar SDK, so it is
+# imported inside the handlers that need it; the page, static and lock-status
+# routes don't pay for it on a cold start.
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from demo_runner import (
-    execute_pay_rent,  # Real payment execution
-    mock_post_reading,
-    execute_split_utilities,  # Real utility split calculation
-    execute_place_bid,  # Real auction bid placement
-    fetch_lease_tree  # Lease tree retrieval
-)
 
 # Get the base directory (web-demo)
 base_dir = os.path.join(os.path.dirname(__file__), '..')
@@ -32,17 +38,38 @@ app = Flask(__name__,
             template_folder=os.path.join(base_dir, 'templates'),
             static_folder=os.path.join(base_dir, 'static'))
 
+# Templates are only reloaded when debugging (Flask's default). Compiled
+# template bytecode also goes to a temp-dir cache so a fresh serverless
+# instance can skip re-parsing them.
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
 
-@app.route('/')
-def index():
-    """Serve the main demo page"""
-    # Read and inject CSS content
+
+def _json(payload, status=200):
+    """
+    JSON response for the API routes, encoded with orjson when it's installed
+
+    orjson.dumps returns the body as bytes directly, so there's no str
+    round-trip as with a custom JSON provider behind jsonify.
+    """
+    if orjson is None:
+        return jsonify(payload), status
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+
+@functools.lru_cache(maxsize=1)
+def _get_css():
+    """Read the inlined stylesheet once per process"""
     css_path = os.path.join(base_dir, 'static', 'style.css')
-    css_content = ""
     if os.path.exists(css_path):
         with open(css_path, 'r') as f:
-            css_content = f.read()
-    return render_template('index.html', css_content=css_content)
+            return f.read()
+    return ""
+
+
+@app.route('/')
+def index():
+    """Serve the main demo page"""
+    return render_template('index.html', css_content=_get_css())
 
 
 @app.route('/lock')
@@ -51,112 +78,110 @@ def lock():
     return render_template('lock.html')
 
 
+# Static directories to search, resolved once at import instead of per request
+_STATIC_DIRS = list(dict.fromkeys(
+    os.path.realpath(d) for d in (os.path.join(base_dir, 'static'), 'static')
+    if os.path.isdir(d)
+))
+
+# Asset names aren't fingerprinted, so cache briefly rather than forever
+_STATIC_MAX_AGE = 3600
+
+# Content types for the extensions the demo serves; anything else falls back
+# to Flask's mimetypes guess
+_MIME = {
+    '.css': 'text/css',
+    '.js': 'application/javascript',
+    '.png': 'image/png',
+    '.svg': 'image/svg+xml',
+    '.ico': 'image/x-icon',
+    '.json': 'application/json',
+    '.woff2': 'font/woff2',
+}
+
+
 # Serve static files
 @app.route('/static/<path:filename>')
 def serve_static(filename):
     """Serve static files like CSS, JS, images"""
-    import mimetypes
-    
-    # Try multiple possible locations
-    possible_dirs = [
-        os.path.join(base_dir, 'static'),
-        os.path.join(os.path.dirname(__file__), '..', 'static'),
-        'static'
-    ]
-    
-    file_path = None
-    for static_dir in possible_dirs:
-        test_path = os.path.join(static_dir, filename)
-        if os.path.exists(test_path):
-            file_path = test_path
-            break
+    for static_dir in _STATIC_DIRS:
+        if os.path.isfile(os.path.join(static_dir, filename)):
+            # send_from_directory guards against path traversal, sets the
+            # content type and lets the server stream the file
+            return send_from_directory(
+                static_dir, filename,
+                mimetype=_MIME.get(os.path.splitext(filename)[1].lower()),
+                max_age=_STATIC_MAX_AGE,
+            )
     
-    if not file_path:
-        print(f"ERROR: File not found: {filename}")
-        print(f"Tried directories: {possible_dirs}")
-        from flask import abort
-        abort(404)
-    
-    # Determine content type
-    content_type, _ = mimetypes.guess_type(filename)
-    if not content_type:
-        if filename.endswith('.css'):
-            content_type = 'text/css'
-        elif filename.endswith('.js'):
-            content_type = 'application/javascript'
-        elif filename.endswith('.png'):
-            content_type = 'image/png'
-        else:
-            content_type = 'application/octet-stream'
-    
-    try:
-        with open(file_path, 'rb') as f:
-            content = f.read()
-        print(f"Serving file: {file_path} ({len(content)} bytes)")
-        return content, 200, {'Content-Type': content_type}
-    except Exception as e:
-        print(f"ERROR serving file: {e}")
-        from flask import abort
-        abort(500)
+    print(f"ERROR: File not found: {filename}")
+    print(f"Tried directories: {_STATIC_DIRS}")
+    abort(404)
+
+
+@app.errorhandler(Exception)
+def handle_error(e):
+    """Report API failures as JSON; other routes keep Flask's error pages"""
+    if isinstance(e, HTTPException):
+        if request.path.startswith('/api/'):
+            return _json({"success": False, "error": e.description}, e.code or 500)
+        return e
+    if request.path.startswith('/api/'):
+        return _json({"success": False, "error": str(e)}, 500)
+    return InternalServerError(original_exception=e)
 
 
 @app.route('/api/pay-rent', methods=['POST'])
 def pay_rent():
     """Execute payment and activation demo - REAL blockchain transaction"""
-    try:
-        # Execute real blockchain payment
-        result = execute_pay_rent()
-        # Mark payment as complete
-        payment_state["complete"] = True
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    from demo_runner import execute_pay_rent
+    
+    # Execute real blockchain payment
+    result = execute_pay_rent()
+    # Mark payment as complete
+    _payment_complete.set()
+    return _json(result)
 
 
 @app.route('/api/post-reading', methods=['POST'])
 def post_reading():
     """Execute utility reading posting demo"""
-    try:
-        # Simulate processing time
-        time.sleep(1)
-        
-        result = mock_post_reading()
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    # Returns straight away; the short loading pause is paced in script.js
+    from demo_runner import mock_post_reading
+    
+    result = mock_post_reading()
+    return _json(result)
 
 
 @app.route('/api/split-utilities', methods=['POST'])
 def split_utilities():
     """Execute utility cost splitting demo - REAL calculation"""
-    try:
-        result = execute_split_utilities()
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    from demo_runner import execute_split_utilities
+    
+    result = execute_split_utilities()
+    return _json(result)
 
 
 @app.route('/api/place-bid', methods=['POST'])
 def place_bid():
     """Place a bid on an auction - REAL blockchain transaction"""
-    try:
-        data = request.json
-        amount = float(data.get('amount', 0))
-        
-        result = execute_place_bid(amount)
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    from demo_runner import execute_place_bid
+    
+    data = request.json
+    amount = float(data.get('amount', 0))
+    
+    result = execute_place_bid(amount)
+    return _json(result)
 
 
 @app.route('/api/lease-tree', methods=['GET'])
 def lease_tree():
     """Fetch the complete lease tree structure"""
-    try:
-        result = fetch_lease_tree()
-        return jsonify(result), 200
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    from demo_runner import fetch_lease_tree
+    
+    # The mock tree is about 2 KB and cached, so it is encoded in one piece;
+    # streaming it would only add per-chunk overhead
+    return _json(fetch_lease_tree())
 
 
 @app.route('/api/check-lock-status', methods=['GET'])
@@ -164,9 +189,10 @@ def check_lock_status():
     """Check if payment has been completed (simple demo state)"""
     # In a real implementation, this would query the blockchain
     # For now, we'll use a simple session or file-based state
-    return jsonify({
-        "payment_complete": payment_state["complete"],
-        "message": "Payment required to unlock" if not payment_state["complete"] else "Unlock enabled"
+    done = _payment_complete.is_set()
+    return _json({
+        "payment_complete": done,
+        "message": "Unlock enabled" if done else "Payment required to unlock"
     })
 
 
@@ -180,7 +180,12 @@ async function fetchUtilities() {
     result.innerHTML = '<div class="loading">Fetching utility readings from oracle</div>';
     
     try {
-        const response = await fetch('/api/post-reading', { method: 'POST' });
+        // Keep the loading state up for a moment; the delay runs alongside
+        // the request so the server isn't held up by it
+        const [response] = await Promise.all([
+            fetch('/api/post-reading', { method: 'POST' }),
+            new Promise(resolve => setTimeout(resolve, 1000))
+        ]);
         
         if (!response.ok) {
             throw new Error(`HTTP error: ${response.status}`);
@@ -1,7 +1,10 @@
-import os, requests, time, json, hashlib
+import os, requests, time, json, hashlib, functools
 from dataclasses import dataclass
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from stellar_sdk import Server, Keypair
+from stellar_sdk.exceptions import NotFoundError
 
 load_dotenv()
 
@@ -10,6 +13,14 @@ PASSPHRASE = os.environ["NETWORK_PASSPHRASE"]
 
 server = Server(HORIZON)
 
+# Shared keep-alive session for friendbot calls, so repeated calls reuse one
+# TCP/TLS connection. Retries only cover idempotent methods.
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_maxsize=8, max_retries=Retry(total=3, backoff_factor=0.3)))
+
+# Accounts known to exist on the network
+_funded = set()
+
 @dataclass
 class Actor:
     kp: Keypair
@@ -18,13 +29,25 @@ def actor_from_env(name: str) -> Actor:
     sec = os.environ[name]
     return Actor(kp=Keypair.from_secret(sec))
 
+@functools.lru_cache(maxsize=None)
+def keypair_from_secret(secret: str) -> Keypair:
+    """Parse a secret seed once; repeat calls reuse the derived keypair"""
+    return Keypair.from_secret(secret)
+
 def ensure_funded(pubkey: str):
-    # idempotent for testnet friendbot
-    r = requests.get("https://friendbot.stellar.org", params={"addr": pubkey}, timeout=15)
-    if r.status_code not in (200, 202, 400):  # 400 means already funded
-        r.raise_for_status()
-    # wait ledger close
-    time.sleep(2)
+    # idempotent for testnet friendbot; accounts that already exist are
+    # remembered so repeat calls skip both friendbot and the ledger wait
+    if pubkey in _funded:
+        return
+    try:
+        server.accounts().account_id(pubkey).call()
+    except NotFoundError:
+        r = session.get("https://friendbot.stellar.org", params={"addr": pubkey}, timeout=15)
+        if r.status_code not in (200, 202, 400):  # 400 means already funded
+            r.raise_for_status()
+        # wait ledger close
+        time.sleep(2)
+    _funded.add(pubkey)
 
 def balances(pubkey: str):
     acct = server.accounts().account_id(pubkey).call()
@@ -44,23 +67,23 @@ def generate_terms_hash(terms_dict):
     Returns:
         str: Hex-encoded SHA-256 hash (64 characters)
     """
-    # Create canonical JSON: sorted keys, no whitespace, UTF-8 encoding
-    canon = json.dumps(terms_dict, separators=(',', ':'), sort_keys=True).encode('utf-8')
-    
-    # Generate SHA-256 hash
-    h = hashlib.sha256(canon).digest()
-    
-    # Return as hex string
-    return h.hex()
+    return generate_terms_digest(terms_dict).hex()
 
-def hex_to_bytes(hex_string):
+def generate_terms_digest(terms_dict):
     """
-    Convert hex string to bytes for Stellar SDK.
+    Generate the raw SHA-256 digest of canonical JSON terms.
+    
+    Use this when the hash is passed on-chain; generate_terms_hash() is the
+    hex form for display.
     
     Args:
-        hex_string: Hex string (64 characters for 32-byte hash)
+        terms_dict: Dictionary containing lease terms
         
     Returns:
-        bytes: Byte representation
+        bytes: 32-byte SHA-256 digest
     """
-    return bytes.fromhex(hex_string)
+    # Create canonical JSON: sorted keys, no whitespace, UTF-8 encoding.
+    # Keep the default ensure_ascii=True: these bytes are hashed on-chain and
+    # must match the client scripts' encoding byte for byte.
+    canon = json.dumps(terms_dict, separators=(',', ':'), sort_keys=True).encode('utf-8')
+    return hashlib.sha256(canon).digest()
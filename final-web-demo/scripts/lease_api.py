@@ -17,12 +17,13 @@ from stellar_sdk import scval
 
 # Add the scripts directory to the path to import common
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from common import generate_terms_hash, hex_to_bytes
+from common import generate_terms_digest
 
 # Load environment variables from config.env in final-web-demo root directory
 # scripts/lease_api.py -> go up to final-web-demo, then config.env
 config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'config.env')
-load_dotenv(config_path, override=True)
+# Variables already set in the environment take precedence over the file
+load_dotenv(config_path, override=False)
 
 class LeaseAPI:
     """Python wrapper for the lease registry contract"""
@@ -57,8 +58,7 @@ class LeaseAPI:
         """Get terms bytes from dict, using cache if available"""
         terms_json = json.dumps(terms_dict, separators=(',', ':'), sort_keys=True)
         if terms_json not in self._terms_cache:
-            terms_hash_hex = generate_terms_hash(terms_dict)
-            self._terms_cache[terms_json] = hex_to_bytes(terms_hash_hex)
+            self._terms_cache[terms_json] = generate_terms_digest(terms_dict)
         return self._terms_cache[terms_json]
     
     def _load_account(self, keypair: Keypair):
@@ -141,10 +141,13 @@ impl AuctionContract {
         if new_total < auction.reserve { panic!("below-reserve"); }
         if new_total < auction.best_bid + auction.min_increment { panic!("insufficient-increment"); }
 
-        // Update auction state
-        auction.second_bid = auction.best_bid;
+        // Update auction state. The leader topping up their own bid doesn't
+        // change the runner-up, so second_bid only moves on a new leader.
+        if bidder != auction.best_bidder {
+            auction.second_bid = auction.best_bid;
+            auction.best_bidder = bidder.clone();
+        }
         auction.best_bid = new_total;
-        auction.best_bidder = bidder.clone();
 
         // Anti-sniping: extend auction if bid is within extend_window
         if auction.extensions_count < auction.max_extensions {
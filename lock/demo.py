@@ -14,6 +14,8 @@ Usage:
 
 import os
 import sys
+import selectors
+import shutil
 import subprocess
 import time
 import threading
@@ -25,9 +27,19 @@ class LeaseLockDemo:
         self.contract_id = None
         self.unit = "unit:NYC:123-A"
         self.daemon_process = None
+        # Absolute path of the stellar CLI, resolved once in check_prerequisites
+        self._stellar = "stellar"
+        self._tenant = None
+        # Watches the daemon's stdout from the main thread, if the platform
+        # can select on pipes
+        self._selector = None
+        self._partial = b""
 
     def run_command(self, cmd: list, capture: bool = True) -> Optional[str]:
         """Run a command and return output if capture=True"""
+        # Keep to plain subprocess.run arguments (no preexec_fn, cwd or
+        # start_new_session) so CPython can spawn with vfork/posix_spawn
+        # instead of a full fork; stellar commands pass its absolute path
         try:
             if capture:
                 result = subprocess.run(cmd, capture_output=True, text=True, check=True)
@@ -49,7 +61,8 @@ class LeaseLockDemo:
         print("Checking prerequisites...")
         
         # Check for stellar CLI
-        if not self.run_command(["stellar", "--version"]):
+        self._stellar = shutil.which("stellar") or "stellar"
+        if not self.run_command([self._stellar, "--version"]):
             print("❌ Stellar CLI not found. Please install it first.")
             return False
         
@@ -77,7 +90,7 @@ class LeaseLockDemo:
         # Install the contract
         print("Installing contract...")
         output = self.run_command([
-            "stellar", "contract", "install",
+            self._stellar, "contract", "install",
             "--wasm", "target/wasm32-unknown-unknown/release/lease_registry.wasm"
         ])
         
@@ -91,7 +104,7 @@ class LeaseLockDemo:
         # Deploy the contract
         print("Deploying contract...")
         deploy_output = self.run_command([
-            "stellar", "contract", "deploy",
+            self._stellar, "contract", "deploy",
             "--id", self.contract_id
         ])
         
@@ -115,10 +128,7 @@ class LeaseLockDemo:
                 [sys.executable, "iot_lock_daemon.py"],
                 env=env,
                 stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
+                stderr=subprocess.STDOUT
             )
             
             # Give daemon time to start
@@ -141,18 +151,55 @@ class LeaseLockDemo:
             return
         
         try:
-            for line in iter(self.daemon_process.stdout.readline, ''):
-                if line:
-                    print(f"[DAEMON] {line.strip()}")
+            # Iterating the pipe reads through its block buffer and splits
+            # lines from that, rather than one readline call per line
+            for line in self.daemon_process.stdout:
+                print(f"[DAEMON] {line.decode(errors='replace').strip()}")
         except Exception as e:
             print(f"Error monitoring daemon: {e}")
 
+    def watch_daemon_output(self) -> bool:
+        """Register the daemon's stdout with a selector; False if pipes can't be selected"""
+        selector = selectors.DefaultSelector()
+        try:
+            selector.register(self.daemon_process.stdout, selectors.EVENT_READ)
+        except (OSError, ValueError):
+            # Windows can only select on sockets
+            selector.close()
+            return False
+        self._selector = selector
+        return True
+
+    def pause(self, seconds: float) -> None:
+        """Sleep for the given time, printing daemon output as it arrives"""
+        if not self._selector:
+            time.sleep(seconds)
+            return
+        
+        fd = self.daemon_process.stdout.fileno()
+        deadline = time.monotonic() + seconds
+        while (remaining := deadline - time.monotonic()) > 0:
+            if not self._selector.select(remaining):
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                # Daemon exited and closed its end of the pipe
+                self._selector.close()
+                self._selector = None
+                time.sleep(max(0.0, deadline - time.monotonic()))
+                return
+            *lines, self._partial = (self._partial + chunk).split(b"\n")
+            for line in lines:
+                print(f"[DAEMON] {line.decode(errors='replace').strip()}")
+
     def trigger_events(self) -> bool:
         """Trigger lease events to test the daemon"""
         print("\n=== Triggering Lease Events ===")
         
         # Get tenant address
-        tenant = self.run_command(["stellar", "keys", "address", "tenant"])
+        if not self._tenant:
+            self._tenant = self.run_command([self._stellar, "keys", "address", "tenant"])
+        tenant = self._tenant
         if not tenant:
             print("❌ Could not get tenant address")
             return False
@@ -167,15 +214,19 @@ class LeaseLockDemo:
             ("Ending lease", ["end_lease", "--unit", self.unit, "--subtenant", tenant])
         ]
         
+        # Each event is its own invoke: a Soroban transaction carries a single
+        # host function call, and the demo wants the daemon to show each
+        # state change separately anyway
+        invoke = [self._stellar, "contract", "invoke", "--id", self.contract_id, "--"]
+        
         for description, args in events:
             print(f"\n{description}...")
             
-            cmd = ["stellar", "contract", "invoke", "--id", self.contract_id, "--"] + args
-            output = self.run_command(cmd)
+            output = self.run_command(invoke + args)
             
             if output:
                 print(f"✓ {description} successful")
-                time.sleep(3)  # Wait for daemon to process
+                self.pause(3)  # Wait for daemon to process
             else:
                 print(f"❌ {description} failed")
         
@@ -183,6 +234,9 @@ class LeaseLockDemo:
 
     def cleanup(self):
         """Clean up resources"""
+        if self._selector:
+            self._selector.close()
+            self._selector = None
         if self.daemon_process:
             print("\nStopping daemon...")
             self.daemon_process.terminate()
@@ -209,12 +263,14 @@ class LeaseLockDemo:
             if not self.start_daemon():
                 return False
             
-            # Start monitoring daemon output
-            monitor_thread = threading.Thread(target=self.monitor_daemon_output, daemon=True)
-            monitor_thread.start()
+            # Show daemon output from this thread while waiting, falling
+            # back to a reader thread where pipes can't be selected
+            if not self.watch_daemon_output():
+                monitor_thread = threading.Thread(target=self.monitor_daemon_output, daemon=True)
+                monitor_thread.start()
             
             # Wait a bit for daemon to initialize
-            time.sleep(3)
+            self.pause(3)
             
             # Trigger events
             if not self.trigger_events():
@@ -229,7 +285,7 @@ class LeaseLockDemo:
             
             # Keep daemon running for a bit to see final state
             print("\nKeeping daemon running for 10 seconds...")
-            time.sleep(10)
+            self.pause(10)
             
             return True
             
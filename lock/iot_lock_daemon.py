@@ -24,10 +24,19 @@ Environment Variables:
 import json
 import time
 import requests
+from requests.adapters import HTTPAdapter
 import sys
 import os
-from datetime import datetime
-from typing import Dict, Any, Optional, Tuple
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+# orjson is optional; it only speeds up reading and writing the state file
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Import the mock lock
 try:
@@ -37,8 +46,35 @@ except ImportError:
     MOCK_LOCK_AVAILABLE = False
     print("Mock lock not available - running in console mode only")
 
+# Poll delay after an empty response, doubling up to the cap while idle
+_IDLE_MIN_MS = 250
+_IDLE_MAX_MS = 8000
+
+# Minimum seconds between writes of the state and cursor files
+_FLUSH_INTERVAL = 0.5
+
+# How many recent event IDs to remember for dropping replayed events
+_SEEN_IDS = 1024
+
+# Event type -> resulting lock state. The contract emits "Activated" and
+# "Delinq"; the others are legacy names. Types not listed (including
+# SubleaseGranted) leave the lock unchanged.
+_EVENT_STATES = {
+    "Activated": "UNLOCKED",
+    "LeaseActivated": "UNLOCKED",
+    "Delinq": "LOCKED",
+    "Delinquent": "LOCKED",
+    "LeaseEnded": "LOCKED",
+}
+
 
 class LockDaemon:
+    __slots__ = (
+        "rpc", "contract_id", "state_file", "cursor_file", "locks", "session",
+        "_idle_ms", "_dirty", "_last_flush", "_filters",
+        "_ts_cache", "_last_cursor", "_extract", "_seen_ids", "_seen_set",
+    )
+    
     def __init__(self):
         self.rpc = os.getenv("STELLAR_RPC", "https://soroban-testnet.stellar.org")
         self.contract_id = os.getenv("LEASE_REGISTRY_ID")
@@ -48,25 +84,68 @@ class LockDaemon:
         # Lock states: lease_id -> {"state": "LOCKED"|"UNLOCKED", "last_event": {...}}
         self.locks: Dict[str, Dict[str, Any]] = {}
         
+        # One keep-alive connection to the RPC, reused across polls instead of
+        # a fresh TCP+TLS handshake per request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        self._idle_ms = _IDLE_MIN_MS
+        
+        # Lock states and cursor changed since the last flush
+        self._dirty = False
+        self._last_flush = 0.0
+        
+        # Event field extractor, chosen from the first event seen
+        self._extract = None
+        
+        # Recently applied event IDs, oldest first, with a set for lookups
+        self._seen_ids: deque = deque(maxlen=_SEEN_IDS)
+        self._seen_set = set()
+        
+        # Cursor as last read from or written to the cursor file
+        self._last_cursor: Optional[str] = None
+        
+        # (formatted UTC time, monotonic time it was formatted at)
+        self._ts_cache = ("", float("-inf"))
+        
         if not self.contract_id:
             print("Error: LEASE_REGISTRY_ID environment variable is required")
             sys.exit(1)
+        
+        # getEvents filter never changes, so it is built once and shared by
+        # every poll's request body
+        self._filters = [{
+            "type": "contract",
+            "contractIds": [self.contract_id],
+        }]
 
     def load_state(self) -> None:
         """Load lock states from persistent storage"""
         if os.path.exists(self.state_file):
             try:
-                with open(self.state_file, 'r') as f:
-                    self.locks.update(json.load(f))
+                with open(self.state_file, 'rb') as f:
+                    data = f.read()
+                self.locks.update(orjson.loads(data) if orjson else json.loads(data))
                 print(f"Loaded {len(self.locks)} lock states from {self.state_file}")
             except (json.JSONDecodeError, IOError) as e:
                 print(f"Warning: Could not load state file {self.state_file}: {e}")
 
     def save_state(self) -> None:
         """Save lock states to persistent storage"""
+        tmp_file = self.state_file + ".tmp"
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(self.locks, f, indent=2)
+            # Write then rename so a crash never leaves a torn state file.
+            # That needs a fresh file per save, so no fd is kept open for
+            # in-place rewrites; flush() already limits saves to two a second
+            if orjson:
+                data = orjson.dumps(self.locks, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(self.locks, indent=2).encode()
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_file, self.state_file)
         except IOError as e:
             print(f"Error: Could not save state file {self.state_file}: {e}")
 
@@ -75,42 +154,59 @@ class LockDaemon:
         if os.path.exists(self.cursor_file):
             try:
                 with open(self.cursor_file, 'r') as f:
-                    cursor = f.read().strip()
-                    return cursor if cursor else None
+                    cursor = f.read().strip() or None
+                self._last_cursor = cursor
+                return cursor
             except IOError as e:
                 print(f"Warning: Could not read cursor file {self.cursor_file}: {e}")
         return None
 
     def put_cursor(self, cursor: Optional[str]) -> None:
         """Save the event cursor for resumption"""
+        if cursor == self._last_cursor:
+            return
+        
+        tmp_file = self.cursor_file + ".tmp"
         try:
-            with open(self.cursor_file, 'w') as f:
+            with open(tmp_file, 'w') as f:
                 f.write(cursor or "")
+            os.replace(tmp_file, self.cursor_file)
+            self._last_cursor = cursor
         except IOError as e:
             print(f"Error: Could not save cursor file {self.cursor_file}: {e}")
 
+    def _now(self) -> str:
+        """UTC timestamp for log lines, reformatted at most once a second"""
+        now = time.monotonic()
+        text, at = self._ts_cache
+        if now - at < 1.0:
+            return text
+        text = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        self._ts_cache = (text, now)
+        return text
+
+    def flush(self, cursor: Optional[str], force: bool = False) -> None:
+        """Persist lock states, then the cursor, at most every _FLUSH_INTERVAL"""
+        if not self._dirty:
+            return
+        if not force and time.monotonic() - self._last_flush < _FLUSH_INTERVAL:
+            return
+        
+        # State first: if we stop between the two writes, the cursor still
+        # points before these events and they are replayed on restart
+        self.save_state()
+        self.put_cursor(cursor)
+        self._dirty = False
+        self._last_flush = time.monotonic()
+
     def apply_event(self, lease_id: str, ev_type: str, who: str, ts: str, event_id: str) -> None:
         """Apply an event to update lock state"""
-        prev_state = self.locks.get(lease_id, {"state": "LOCKED"})
-        
-        # Determine new state based on event type
-        # Contract emits "Activated" and "Delinq" events
-        if ev_type == "Activated":
-            new_state = "UNLOCKED"
-        elif ev_type == "Delinq":
-            new_state = "LOCKED"
-        elif ev_type in ("Delinquent", "LeaseEnded", "LeaseActivated"):  # Legacy compatibility
-            if ev_type == "LeaseActivated":
-                new_state = "UNLOCKED"
-            else:
-                new_state = "LOCKED"
-        elif ev_type == "SubleaseGranted":
-            # Optional: no state change for sublease granted
-            return
-        else:
-            # Unknown event type, ignore
+        new_state = _EVENT_STATES.get(ev_type)
+        if new_state is None:
             return
         
+        prev_state = self.locks.get(lease_id, {"state": "LOCKED"})
+        
         # Update lock state
         self.locks[lease_id] = {
             "state": new_state,
@@ -122,12 +218,11 @@ class LockDaemon:
             }
         }
         
-        # Save state immediately
-        self.save_state()
+        # Written out by flush() along with the cursor
+        self._dirty = True
         
         # Log state change
-        timestamp = datetime.utcnow().isoformat() + "Z"
-        print(f"[{timestamp}] lease_id={lease_id}: {prev_state['state']} -> {new_state} ({ev_type})")
+        print(f"[{self._now()}] lease_id={lease_id}: {prev_state['state']} -> {new_state} ({ev_type})")
         
         # Update mock lock if available
         if MOCK_LOCK_AVAILABLE:
@@ -139,32 +234,57 @@ class LockDaemon:
             }
             update_lock_state(lease_id, new_state, event_info)
 
+    def apply_events(self, events: List[Dict[str, Any]]) -> int:
+        """Apply a batch of RPC events, keeping only each lease's last state change
+        
+        Returns the number of new (not previously seen) events applied.
+        """
+        final: Dict[str, Tuple[str, str, str, str, str]] = {}
+        batch_ids: Dict[str, None] = {}
+        for item in events:
+            parsed = self.parse_event(item)
+            if parsed[1] not in _EVENT_STATES:
+                continue
+            
+            # Overlapping pages after a retry can repeat events already applied
+            event_id = parsed[4]
+            if event_id:
+                if event_id in self._seen_set or event_id in batch_ids:
+                    continue
+                batch_ids[event_id] = None
+            
+            final[parsed[0]] = parsed
+        
+        for lease_id, ev_type, who, ts, event_id in final.values():
+            self.apply_event(lease_id, ev_type, who, ts, event_id)
+        
+        # Only mark the batch seen once it has all been applied; if applying
+        # raises, run() refetches the page and it must not be skipped then
+        for event_id in batch_ids:
+            if len(self._seen_ids) == _SEEN_IDS:
+                self._seen_set.discard(self._seen_ids[0])
+            self._seen_ids.append(event_id)
+            self._seen_set.add(event_id)
+        
+        return len(final)
+
     def fetch_events(self, cursor: Optional[str] = None) -> Dict[str, Any]:
         """Fetch events from Stellar RPC"""
-        body = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "getEvents",
-            "params": {
-                "filters": [{
-                    "type": "contract",
-                    "contractIds": [self.contract_id],
-                }],
-                "limit": 50
-            }
-        }
+        params = {"filters": self._filters, "limit": 200}
         
         # Add cursor or start ledger
         if cursor:
-            body["params"]["pagination"] = {"cursor": cursor}
+            params["pagination"] = {"cursor": cursor}
         else:
             # Start from a recent ledger to avoid huge scans on first run
             # Use a recent ledger number (must be positive)
             # Using a large number to get recent events
-            body["params"]["startLedger"] = 100000000
+            params["startLedger"] = 100000000
+        
+        body = {"jsonrpc": "2.0", "id": 1, "method": "getEvents", "params": params}
         
         try:
-            response = requests.post(self.rpc, json=body, timeout=20)
+            response = self.session.post(self.rpc, json=body, timeout=20)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
@@ -173,6 +293,30 @@ class LockDaemon:
 
     def parse_event(self, item: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
         """Parse event data from RPC response"""
+        if self._extract is None:
+            # The RPC's event schema doesn't change between responses, so
+            # look at the first event once and keep the matching extractor
+            if len(item.get("topicText") or ()) > 1:
+                self._extract = self._parse_text_event
+            else:
+                self._extract = self._parse_any_event
+        return self._extract(item)
+
+    def _parse_text_event(self, item: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+        """Read an event that carries decoded topicText, falling back if it doesn't"""
+        topic_texts = item.get("topicText")
+        value = item.get("value")
+        if not topic_texts or len(topic_texts) < 2 or not isinstance(value, dict):
+            return self._parse_any_event(item)
+        
+        who = value.get("address") or value.get("valueText") or "G..."
+        event_id = item.get("pagingToken") or item.get("id", "")
+        # Interned so the _EVENT_STATES lookup matches the key by identity
+        ev_type = sys.intern(str(topic_texts[0]))
+        return topic_texts[1], ev_type, who, item.get("ts", ""), event_id
+
+    def _parse_any_event(self, item: Dict[str, Any]) -> Tuple[str, str, str, str, str]:
+        """Parse an event of any known shape, probing each alternative key"""
         # Extract event type from topics
         topics = item.get("topic", []) or item.get("topics", [])
         topic_texts = item.get("topicText", [])
@@ -191,15 +335,19 @@ class LockDaemon:
         elif topics and len(topics) > 1:
             lease_id = str(topics[1])
         
-        # Address is in the value field
-        value = item.get("value", {})
+        # Address is in the value field (which may be raw XDR, not a dict)
+        value = item.get("value")
+        if not isinstance(value, dict):
+            value = {}
         who = value.get("address") or value.get("valueText") or "G..."
         
         # Timestamp and ID
         ts = item.get("ts", "")
         event_id = item.get("pagingToken") or item.get("id", "")
         
-        return lease_id, ev_type, who, ts, event_id
+        # topicText entries aren't always strings; str() them, as
+        # _parse_text_event does, so sys.intern can't reject the event
+        return lease_id, sys.intern(str(ev_type)), who, ts, event_id
 
     def run(self) -> None:
         """Main daemon loop"""
@@ -219,11 +367,18 @@ class LockDaemon:
         else:
             print("Starting fresh - will fetch recent events")
         
+        # While events are arriving, the next page is fetched on this worker
+        # as the current one is applied, so the RPC round trip overlaps with
+        # event processing
+        fetcher = ThreadPoolExecutor(max_workers=1)
+        pending = None
+        
         try:
             while True:
                 try:
                     # Fetch events
-                    response = self.fetch_events(cursor)
+                    response = pending.result() if pending else self.fetch_events(cursor)
+                    pending = None
                     
                     if "error" in response:
                         print(f"RPC error: {response['error']}")
@@ -232,31 +387,48 @@ class LockDaemon:
                     
                     result = response.get("result", {})
                     events = result.get("events", [])
+                    next_cursor = result.get("cursor")
+                    advanced = bool(next_cursor) and next_cursor != cursor
+                    
+                    # Prefetching from an unchanged cursor would only fetch
+                    # the same page again
+                    if events and advanced:
+                        pending = fetcher.submit(self.fetch_events, next_cursor)
                     
                     # Process events
-                    for event in events:
-                        lease_id, ev_type, who, ts, event_id = self.parse_event(event)
-                        self.apply_event(lease_id, ev_type, who, ts, event_id)
+                    applied = self.apply_events(events)
                     
                     # Update cursor
-                    next_cursor = result.get("cursor")
-                    if next_cursor:
-                        self.put_cursor(next_cursor)
+                    if advanced:
                         cursor = next_cursor
+                        self._dirty = True
+                    self.flush(cursor)
                     
-                    # Sleep before next poll
-                    time.sleep(1)
+                    # Poll again straight away while new events are arriving;
+                    # back off exponentially while the contract is quiet, or
+                    # while the RPC keeps returning a page already applied
+                    if advanced or applied:
+                        self._idle_ms = 0
+                        continue
+                    time.sleep(self._idle_ms / 1000)
+                    self._idle_ms = min(self._idle_ms * 2 or _IDLE_MIN_MS, _IDLE_MAX_MS)
                     
                 except KeyboardInterrupt:
                     print("\nShutting down gracefully...")
                     break
                 except Exception as e:
                     print(f"Unexpected error: {e}")
+                    # Drop any prefetched page; the cursor wasn't advanced, so
+                    # the failed batch is fetched again
+                    pending = None
                     time.sleep(2)
                     
         except KeyboardInterrupt:
             print("\nExiting.")
         finally:
+            fetcher.shutdown(wait=False, cancel_futures=True)
+            self.flush(cursor, force=True)
+            
             # Stop mock lock if running
             if MOCK_LOCK_AVAILABLE:
                 stop_mock_lock()
@@ -11,17 +11,21 @@ from typing import Dict, Any, Optional
 
 
 class MockLock:
+    __slots__ = ("state", "last_event", "updated_at", "running")
+    
     def __init__(self):
-        self.locks: Dict[str, Dict[str, Any]] = {}
+        # Parallel maps keyed by unit, so an update is three plain stores
+        # instead of a fresh dict per event
+        self.state: Dict[str, str] = {}
+        self.last_event: Dict[str, Dict[str, Any]] = {}
+        self.updated_at: Dict[str, float] = {}
         self.running = False
     
     def update_state(self, unit: str, state: str, event_info: Dict[str, Any]) -> None:
         """Update the lock state for a unit"""
-        self.locks[unit] = {
-            "state": state,
-            "last_event": event_info,
-            "updated_at": time.time()
-        }
+        self.state[unit] = state
+        self.last_event[unit] = event_info
+        self.updated_at[unit] = time.time()
         
         # Print simple status update
         status_symbol = "[UNLOCKED]" if state == "UNLOCKED" else "[LOCKED]"
@@ -33,11 +37,11 @@ class MockLock:
     
     def get_state(self, unit: str) -> Optional[str]:
         """Get the current state of a lock"""
-        return self.locks.get(unit, {}).get("state")
+        return self.state.get(unit)
     
     def list_all_locks(self) -> Dict[str, str]:
         """Get all lock states"""
-        return {unit: data["state"] for unit, data in self.locks.items()}
+        return dict(self.state)
     
     def start(self) -> None:
         """Start the mock lock interface"""
@@ -52,11 +56,11 @@ class MockLock:
         print("Mock Lock Interface Stopped")
         
         # Show final status
-        if self.locks:
+        if self.state:
             print("\nFinal Lock States:")
-            for unit, data in self.locks.items():
-                status_symbol = "[UNLOCKED]" if data["state"] == "UNLOCKED" else "[LOCKED]"
-                print(f"  {status_symbol} {unit}: {data['state']}")
+            for unit, state in self.state.items():
+                status_symbol = "[UNLOCKED]" if state == "UNLOCKED" else "[LOCKED]"
+                print(f"  {status_symbol} {unit}: {state}")
 
 
 # Global mock lock instance
@@ -139,47 +139,27 @@ class LockSystemTester:
             # Test contract invocation
             print(f"\nTesting contract events for unit: {self.unit}")
             
-            # Test activate_lease
-            print("Testing activate_lease...")
-            cmd = [
+            # The three calls stay sequential: they're signed by the same
+            # account, so concurrent submissions would race on its sequence
+            # number, and the transitions must land in this order. Each
+            # invoke returns once its transaction is in a ledger, so no
+            # extra sleep is needed between them.
+            base = [
                 "stellar", "contract", "invoke",
                 "--source-account", "test-tenant",
                 "--id", self.contract_id,
-                "--", "activate_lease",
-                "--unit", self.unit,
-                "--subtenant", self.tenant_address
+                "--",
             ]
+            args = ["--unit", self.unit, "--subtenant", self.tenant_address]
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                print("+ activate_lease successful")
-            else:
-                print(f"X activate_lease failed: {result.stderr}")
-                return False
-            
-            time.sleep(2)
-            
-            # Test set_delinquent
-            print("Testing set_delinquent...")
-            cmd[6] = "set_delinquent"
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                print("+ set_delinquent successful")
-            else:
-                print(f"X set_delinquent failed: {result.stderr}")
-                return False
-            
-            time.sleep(2)
-            
-            # Test end_lease
-            print("Testing end_lease...")
-            cmd[6] = "end_lease"
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            if result.returncode == 0:
-                print("+ end_lease successful")
-            else:
-                print(f"X end_lease failed: {result.stderr}")
-                return False
+            for verb in ("activate_lease", "set_delinquent", "end_lease"):
+                print(f"Testing {verb}...")
+                result = subprocess.run(base + [verb] + args, capture_output=True, text=True, timeout=30)
+                if result.returncode == 0:
+                    print(f"+ {verb} successful")
+                else:
+                    print(f"X {verb} failed: {result.stderr}")
+                    return False
             
             print("\n+ Contract events test completed successfully!")
             return True
@@ -3,27 +3,62 @@
 Flask Web Demo Application for Lease-Lock System
 
 This is a Vercel serverless function that serves the demo interface
-and provides API endpoints for each demo step.
+and provides API endpoints for each demo step. final-web-demo/ is a separately
+deployed copy of the demo with its own app; the two never share a process.
 """
 
 import os
 import sys
+import functools
+import gzip
+import hashlib
+import json
+import secrets
+import threading
 import time
-from flask import Flask, render_template, jsonify, request
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, Response, render_template, jsonify, make_response, request
+from jinja2 import FileSystemBytecodeCache
+
+# orjson is optional; it only speeds up encoding the API responses
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Simple in-memory state for demo
-# In production, this would be stored in a database or blockchain
-payment_state = {"complete": False}
+# In production, this would be stored in a database or blockchain.
+# Payment flags are kept per browser (keyed by the sid cookie) as sid ->
+# time paid, oldest first, so expired and excess sessions drop off the front.
+_SESSION_TTL = 3600
+_MAX_SESSIONS = 10000
+_paid_sessions = OrderedDict()
+_paid_lock = threading.Lock()
+
+# With REDIS_URL set, the flags live in Redis instead, so every worker
+# process sees the same payments
+_redis = None
+if os.getenv("REDIS_URL"):
+    import redis
+    _redis = redis.Redis.from_url(os.environ["REDIS_URL"], decode_responses=True)
+
+# ASYNC_JOBS=1 runs pay-rent and place-bid on a worker pool and answers 202
+# with a job id to poll, so a long-lived server doesn't hold a request thread
+# for each on-chain wait. Off by default: a serverless instance may be frozen
+# once its response is sent, and a poll may reach a different instance. Jobs
+# are tracked per process, so a self-hosted server must run a single worker.
+ASYNC_JOBS = os.getenv("ASYNC_JOBS") == "1"
+_JOB_TTL = 600
+_jobs = OrderedDict()  # job id -> (submitted at, future), oldest first
+_jobs_lock = threading.Lock()
+_job_pool = ThreadPoolExecutor(max_workers=8) if ASYNC_JOBS else None
 
-# Add api directory to path
+# Add api directory to path. demo_runner loads config.env and the client
+# scripts, so it is imported inside the handlers that need it; the page and
+# lock-status routes don't pay for it on a cold start.
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from demo_runner import (
-    execute_pay_rent,  # Real payment execution
-    mock_post_reading,
-    execute_split_utilities,  # Real utility split calculation
-    execute_place_bid,  # Real auction bid placement
-    fetch_lease_tree  # Lease tree retrieval
-)
 
 # Get the base directory (web-demo)
 base_dir = os.path.join(os.path.dirname(__file__), '..')
@@ -32,6 +67,54 @@ app = Flask(__name__,
             template_folder=os.path.join(base_dir, 'templates'),
             static_folder=os.path.join(base_dir, 'static'))
 
+# Templates are only reloaded when debugging (Flask's default). Compiled
+# template bytecode also goes to a temp-dir cache so a fresh serverless
+# instance can skip re-parsing them.
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
+
+
+@functools.lru_cache(maxsize=None)
+def _asset_digest(path, mtime_ns):
+    """Short content hash of a static file, recomputed only when it changes"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:8]
+
+
+def asset_url(filename):
+    """Static URL versioned by the file's content, so it can be cached for good"""
+    path = os.path.join(app.static_folder, filename)
+    try:
+        # Only the debug server sees static files change under it; deployed,
+        # each file's first digest is kept and nothing is stat'ed per render
+        mtime_ns = os.stat(path).st_mtime_ns if app.debug else 0
+        return f"/static/{filename}?v={_asset_digest(path, mtime_ns)}"
+    except OSError:
+        # A missing asset shouldn't take the page down with it
+        return f"/static/{filename}"
+
+
+app.jinja_env.globals['asset_url'] = asset_url
+
+
+@app.after_request
+def cache_versioned_assets(response):
+    """Versioned static URLs never change content, so browsers needn't revalidate"""
+    if request.path.startswith('/static/') and 'v' in request.args and response.status_code == 200:
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+def _json(payload, status=200):
+    """
+    JSON response for the API routes, encoded with orjson when it's installed
+
+    orjson.dumps returns the body as bytes directly, so there's no str
+    round-trip as with a custom JSON provider behind jsonify.
+    """
+    if orjson is None:
+        return jsonify(payload), status
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
 
 @app.route('/')
 def index():
@@ -45,63 +128,165 @@ def lock():
     return render_template('lock.html')
 
 
+def mark_paid(sid):
+    """Record that the browser with this sid has paid"""
+    if _redis is not None:
+        _redis.set(f"lease:paid:{sid}", "1", ex=_SESSION_TTL)
+        return
+    now = time.monotonic()
+    with _paid_lock:
+        _paid_sessions[sid] = now
+        _paid_sessions.move_to_end(sid)
+        while _paid_sessions:
+            oldest_sid, paid_at = next(iter(_paid_sessions.items()))
+            if len(_paid_sessions) <= _MAX_SESSIONS and now - paid_at < _SESSION_TTL:
+                break
+            del _paid_sessions[oldest_sid]
+
+
+def is_paid(sid):
+    """Whether the browser with this sid paid within the session TTL"""
+    if not sid:
+        return False
+    if _redis is not None:
+        return _redis.get(f"lease:paid:{sid}") == "1"
+    with _paid_lock:
+        paid_at = _paid_sessions.get(sid)
+    return paid_at is not None and time.monotonic() - paid_at < _SESSION_TTL
+
+
+def submit_job(fn, *args):
+    """Run fn on the job pool and answer 202 with the id to poll"""
+    job_id = uuid.uuid4().hex
+    now = time.monotonic()
+    with _jobs_lock:
+        _jobs[job_id] = (now, _job_pool.submit(fn, *args))
+        while _jobs:
+            oldest_id, (submitted_at, _) = next(iter(_jobs.items()))
+            if now - submitted_at < _JOB_TTL:
+                break
+            del _jobs[oldest_id]
+    return _json({"job_id": job_id, "state": "pending"}, 202)
+
+
+@app.route('/api/job/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Poll a pay-rent or place-bid job; 202 until it finishes"""
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+    if job is None:
+        return _json({"success": False, "error": "Unknown or expired job"}, 404)
+    future = job[1]
+    if not future.done():
+        return _json({"job_id": job_id, "state": "pending"}, 202)
+    try:
+        return _json(future.result())
+    except Exception as e:
+        return _json({"success": False, "error": str(e)}, 500)
+
+
+def pay_rent_for(sid):
+    """Execute the payment, then mark it complete for this browser"""
+    from demo_runner import execute_pay_rent
+    
+    result = execute_pay_rent()
+    mark_paid(sid)
+    return result
+
+
 @app.route('/api/pay-rent', methods=['POST'])
 def pay_rent():
     """Execute payment and activation demo - REAL blockchain transaction"""
     try:
-        # Execute real blockchain payment
-        result = execute_pay_rent()
-        # Mark payment as complete
-        payment_state["complete"] = True
-        return jsonify(result), 200
+        sid = request.cookies.get('sid') or secrets.token_hex(16)
+        if ASYNC_JOBS:
+            response = make_response(submit_job(pay_rent_for, sid))
+        else:
+            # Execute real blockchain payment
+            response = make_response(_json(pay_rent_for(sid)))
+        response.set_cookie('sid', sid, max_age=_SESSION_TTL, httponly=True, samesite='Lax')
+        return response
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return _json({"success": False, "error": str(e)}, 500)
 
 
 @app.route('/api/post-reading', methods=['POST'])
 def post_reading():
     """Execute utility reading posting demo"""
+    # Returns straight away; the short loading pause is paced in script.js
     try:
-        # Simulate processing time
-        time.sleep(1)
+        from demo_runner import mock_post_reading
         
         result = mock_post_reading()
-        return jsonify(result), 200
+        return _json(result)
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return _json({"success": False, "error": str(e)}, 500)
 
 
 @app.route('/api/split-utilities', methods=['POST'])
 def split_utilities():
     """Execute utility cost splitting demo - REAL calculation"""
     try:
+        from demo_runner import execute_split_utilities
+        
         result = execute_split_utilities()
-        return jsonify(result), 200
+        return _json(result)
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return _json({"success": False, "error": str(e)}, 500)
 
 
 @app.route('/api/place-bid', methods=['POST'])
 def place_bid():
     """Place a bid on an auction - REAL blockchain transaction"""
     try:
+        from demo_runner import execute_place_bid
+        
         data = request.json
         amount = float(data.get('amount', 0))
         
+        if ASYNC_JOBS:
+            return submit_job(execute_place_bid, amount)
         result = execute_place_bid(amount)
-        return jsonify(result), 200
+        return _json(result)
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return _json({"success": False, "error": str(e)}, 500)
+
+
+# lru_cache alone would let a burst of first requests each build the tree;
+# holding this while reading the cache makes one build it and the rest wait
+_lease_tree_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1)
+def _lease_tree_body():
+    """Encoded lease tree, its gzipped form and ETag; the tree is fixed for the process"""
+    from demo_runner import fetch_lease_tree
+    
+    result = fetch_lease_tree()
+    body = orjson.dumps(result) if orjson else json.dumps(result).encode()
+    return body, gzip.compress(body, compresslevel=6), hashlib.sha256(body).hexdigest()
 
 
 @app.route('/api/lease-tree', methods=['GET'])
 def lease_tree():
     """Fetch the complete lease tree structure"""
     try:
-        result = fetch_lease_tree()
-        return jsonify(result), 200
+        with _lease_tree_lock:
+            body, gzipped, etag = _lease_tree_body()
+        if 'gzip' in request.accept_encodings:
+            response = Response(gzipped, mimetype='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+            # Each encoding is its own representation, so it gets its own tag
+            etag += '-gz'
+        else:
+            response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'max-age=30, must-revalidate'
+        response.headers['Vary'] = 'Accept-Encoding'
+        # Answers a matching If-None-Match with an empty 304
+        return response.make_conditional(request)
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return _json({"success": False, "error": str(e)}, 500)
 
 
 @app.route('/api/check-lock-status', methods=['GET'])
@@ -109,9 +294,10 @@ def check_lock_status():
     """Check if payment has been completed (simple demo state)"""
     # In a real implementation, this would query the blockchain
     # For now, we'll use a simple session or file-based state
-    return jsonify({
-        "payment_complete": payment_state["complete"],
-        "message": "Payment required to unlock" if not payment_state["complete"] else "Unlock enabled"
+    done = is_paid(request.cookies.get('sid'))
+    return _json({
+        "payment_complete": done,
+        "message": "Unlock enabled" if done else "Payment required to unlock"
     })
 
 
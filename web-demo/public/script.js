@@ -46,6 +46,17 @@ function updateHeader(tab) {
     document.getElementById('pageSubtitle').textContent = info.subtitle;
 }
 
+// Servers running with ASYNC_JOBS answer 202 with a job id; poll it until
+// the job finishes and return the final response
+async function awaitJob(response) {
+    while (response.status === 202) {
+        const { job_id } = await response.json();
+        await new Promise(resolve => setTimeout(resolve, 1000));
+        response = await fetch(`/api/job/${job_id}`);
+    }
+    return response;
+}
+
 async function placeBid() {
     const bidInput = document.getElementById('bidAmount');
     const btn = document.getElementById('btnPlaceBid');
@@ -64,11 +75,11 @@ async function placeBid() {
     result.innerHTML = '<div class="loading">Placing bid on blockchain</div>';
     
     try {
-        const response = await fetch('/api/place-bid', {
+        const response = await awaitJob(await fetch('/api/place-bid', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ amount: bidAmount })
-        });
+        }));
         
         const data = await response.json();
         
@@ -122,7 +133,7 @@ async function runPayRent() {
     result.innerHTML = '<div class="loading">Executing payment transaction</div>';
     
     try {
-        const response = await fetch('/api/pay-rent', { method: 'POST' });
+        const response = await awaitJob(await fetch('/api/pay-rent', { method: 'POST' }));
         const data = await response.json();
         
         if (data.success) {
@@ -180,7 +191,12 @@ async function fetchUtilities() {
     result.innerHTML = '<div class="loading">Fetching utility readings from oracle</div>';
     
     try {
-        const response = await fetch('/api/post-reading', { method: 'POST' });
+        // Keep the loading state up for a moment; the delay runs alongside
+        // the request so the server isn't held up by it
+        const [response] = await Promise.all([
+            fetch('/api/post-reading', { method: 'POST' }),
+            new Promise(resolve => setTimeout(resolve, 1000))
+        ]);
         
         if (!response.ok) {
             throw new Error(`HTTP error: ${response.status}`);